@@ -0,0 +1,80 @@
+"""
+Compare request latency and throughput when the in-memory store is called
+inline on the event loop and when every call hops to the thread pool.
+
+Requests are driven through the ASGI app in-process with httpx, so the
+numbers exclude networking and isolate the dispatch path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src import app as app_module
+
+CONCURRENCY = 64
+REQUESTS = 4_000
+
+
+def make_catalog():
+    return {
+        f"Activity {i}": {
+            "description": "Registration week",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": REQUESTS,
+            "participants": [],
+        }
+        for i in range(16)
+    }
+
+
+async def run(blocking):
+    app_module.store.blocking = blocking
+    app_module.load_activities(make_catalog())
+    transport = httpx.ASGITransport(app=app_module.app)
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(REQUESTS):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                email = f"s{i}@mergington.edu"
+                start = time.perf_counter()
+                if i % 2:
+                    await client.get(f"/students/{email}/activities")
+                else:
+                    await client.post(f"/activities/Activity {i % 16}/signup?email={email}")
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return (
+        REQUESTS / elapsed,
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.99)],
+    )
+
+
+def main():
+    original = app_module.store.blocking
+    print(f"{REQUESTS} requests, {CONCURRENCY} concurrent clients, in-memory store")
+    for label, blocking in (("event loop", False), ("thread pool", True)):
+        rate, p50, p99 = asyncio.run(run(blocking))
+        print(f"{label:<12} {rate:>9,.0f} req/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+    app_module.store.blocking = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare serving GET /activities by encoding the catalog on every request
+(FastAPI's default jsonable_encoder + json.dumps path) with serving the
+version-cached pre-encoded body.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_catalog_cache
+"""
+
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from src.cache import ResponseCache
+from src.storage import MemoryStore
+
+PARTICIPANTS_PER_ACTIVITY = 20
+ITERATIONS = 50
+
+
+def make_catalog(size):
+    return {
+        f"Activity {i}": {
+            "description": f"Description of activity {i}",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": PARTICIPANTS_PER_ACTIVITY * 2,
+            "participants": [
+                f"student{i}-{j}@mergington.edu" for j in range(PARTICIPANTS_PER_ACTIVITY)
+            ],
+        }
+        for i in range(size)
+    }
+
+
+def per_call_ms(func):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def main():
+    for size in (1_000, 10_000):
+        store = MemoryStore()
+        store.load(make_catalog(size))
+        cache = ResponseCache()
+
+        def uncached():
+            return json.dumps(jsonable_encoder(store.list_activities())).encode()
+
+        def cached():
+            return cache.get("activities", store.version, store.list_activities).body
+
+        body = cached()
+        print(f"{size:>6} activities ({len(body) / 1024:,.0f} KiB)")
+        print(f"    encode per request  {per_call_ms(uncached):9.3f} ms")
+        print(f"    cached body         {per_call_ms(cached):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
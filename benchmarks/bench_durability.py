@@ -0,0 +1,78 @@
+"""
+Measure signup latency for each durability mode of the persistent backends.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_durability
+"""
+
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from src.storage import DURABILITY_MODES, JournaledStore, SQLiteStore
+
+SIGNUPS_PER_WRITER = 250
+WRITERS = 4
+
+
+def make_catalog():
+    return {
+        "Registration Week": {
+            "description": "Every signup lands here",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": SIGNUPS_PER_WRITER * WRITERS,
+            "participants": [],
+        }
+    }
+
+
+def run(store):
+    """Return the latency of every signup made by concurrent writers, in ms."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for i in range(SIGNUPS_PER_WRITER):
+            start = time.perf_counter()
+            store.signup("Registration Week", f"s{n}-{i}@mergington.edu")
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+
+def report(label, latencies):
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{label:<20} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main():
+    print(f"{WRITERS} writers x {SIGNUPS_PER_WRITER} signups")
+    for durability in DURABILITY_MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            store = JournaledStore(directory, durability=durability)
+            store.load(make_catalog())
+            report(f"journal/{durability}", run(store))
+            store.close()
+
+    for durability in DURABILITY_MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteStore(os.path.join(directory, "activities.db"), durability)
+            store.load(make_catalog())
+            report(f"sqlite/{durability}", run(store))
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare peak memory of exporting every roster by serializing
+``list_activities()`` in one shot against streaming ``GET /export`` chunks,
+for the in-memory and SQLite stores, with 5000 activities of 100 students.
+
+Peak memory is the tracemalloc high-water mark above the store's own
+footprint, so it counts only what the export allocates.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.cache import encode_json
+from src.exporter import export_chunks
+from src.storage import MemoryStore, SQLiteStore
+
+ACTIVITIES = 5000
+ROSTER = 100
+
+
+def make_catalog():
+    return {
+        f"Activity {n}": {
+            "description": f"Activity number {n}",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": ROSTER,
+            "participants": [f"student{n}-{i}@mergington.edu" for i in range(ROSTER)],
+        }
+        for n in range(ACTIVITIES)
+    }
+
+
+def one_shot(store):
+    return len(encode_json(store.list_activities()))
+
+
+def streamed(store):
+    return sum(len(chunk) for chunk in export_chunks(store.export(), "json"))
+
+
+def measure(export, store):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = export(store)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak / 2**20, elapsed * 1000
+
+
+def compare(label, store):
+    for name, export in (("one shot", one_shot), ("streamed", streamed)):
+        size, peak, elapsed = measure(export, store)
+        print(f"{label:<7} {name:<9} {size / 2**20:6.1f} MiB out   "
+              f"peak {peak:7.2f} MiB   {elapsed:7.1f} ms")
+
+
+def main():
+    print(f"Exporting {ACTIVITIES} activities x {ROSTER} participants as JSON")
+    catalog = make_catalog()
+    store = MemoryStore()
+    store.load(catalog)
+    compare("memory", store)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteStore(os.path.join(directory, "activities.db"))
+        try:
+            store.load(catalog)
+            compare("sqlite", store)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare signup throughput of the pure in-memory store with the journaled
+store, single-threaded and with concurrent writers sharing group commits.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_journal
+"""
+
+import tempfile
+import threading
+import time
+
+from src.storage import JournaledStore, MemoryStore
+
+SIGNUPS = 4_000
+
+
+def make_catalog():
+    return {
+        "Registration Week": {
+            "description": "Every signup lands here",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": SIGNUPS,
+            "participants": [],
+        }
+    }
+
+
+def run(store, threads):
+    per_thread = SIGNUPS // threads
+
+    def worker(n):
+        for i in range(per_thread):
+            store.signup("Registration Week", f"s{n}-{i}@mergington.edu")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    memory = MemoryStore()
+    memory.load(make_catalog())
+    print(f"{'in-memory':<28} {run(memory, 1):>12,.0f} signups/s")
+
+    for threads in (1, 4, 16):
+        with tempfile.TemporaryDirectory() as directory:
+            store = JournaledStore(directory)
+            store.load(make_catalog())
+            rate = run(store, threads)
+            store.close()
+        print(f"{f'journaled, {threads} writer(s)':<28} {rate:>12,.0f} signups/s")
+
+
+if __name__ == "__main__":
+    main()
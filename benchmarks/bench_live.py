@@ -0,0 +1,121 @@
+"""
+Hold thousands of idle /activities/live WebSocket connections in one worker
+and measure the memory they cost, then fire a burst of signups and count how
+many capacity updates the coalescing feed actually sends.
+
+Connections are driven through the ASGI interface in-process, so the numbers
+cover the app's per-connection state but not a server's socket buffers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_live
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from src import app as app_module
+
+CONNECTIONS = 5_000
+ACTIVITIES = 16
+SIGNUPS = 2_000
+
+
+def make_catalog():
+    return {
+        f"Activity {i}": {
+            "description": "Registration week",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": SIGNUPS,
+            "participants": [],
+        }
+        for i in range(ACTIVITIES)
+    }
+
+
+class Connection:
+    """An in-process ASGI WebSocket client."""
+
+    def __init__(self, activity):
+        self.incoming = asyncio.Queue()
+        self.received = 0
+        self.accepted = asyncio.Event()
+        self.incoming.put_nowait({"type": "websocket.connect"})
+        self.incoming.put_nowait(
+            {"type": "websocket.receive", "text": f'{{"subscribe": ["{activity}"]}}'}
+        )
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": "/activities/live",
+            "raw_path": b"/activities/live",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self.task = asyncio.create_task(app_module.app(scope, self.incoming.get, self.send))
+
+    async def send(self, message):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            self.received += 1
+
+    async def close(self):
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+async def run():
+    app_module.load_activities(make_catalog())
+    feed = app_module.capacity_feed
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    connections = [Connection(f"Activity {i % ACTIVITIES}") for i in range(CONNECTIONS)]
+    await asyncio.gather(*(connection.accepted.wait() for connection in connections))
+    # Let the feed send everyone their initial capacity
+    await asyncio.sleep(feed.interval * 2)
+    opened = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0] - before
+
+    initial = sum(connection.received for connection in connections)
+    start = time.perf_counter()
+    for i in range(SIGNUPS):
+        app_module.store.signup(f"Activity {i % ACTIVITIES}", f"s{i}@mergington.edu")
+        app_module.broadcaster.notify()
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    burst = time.perf_counter() - start
+    await asyncio.sleep(feed.interval * 2)
+    updates = sum(connection.received for connection in connections) - initial
+    after_burst = tracemalloc.get_traced_memory()[0] - before
+
+    await asyncio.gather(*(connection.close() for connection in connections))
+    connections.clear()
+    await asyncio.sleep(feed.interval * 2)
+    left = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{CONNECTIONS} connections watching {ACTIVITIES} activities, in-memory store")
+    print(f"opened in {opened:.2f} s, holding {held / 1024 / 1024:.1f} MiB "
+          f"({held / CONNECTIONS / 1024:.1f} KiB per connection)")
+    print(f"{SIGNUPS} signups in {burst * 1000:.0f} ms -> {updates} updates sent "
+          f"({updates / CONNECTIONS:.1f} per connection, "
+          f"{feed.interval * 1000:.0f} ms coalescing window), "
+          f"holding {after_burst / 1024 / 1024:.1f} MiB")
+    print(f"after closing: {left / 1024:.0f} KiB still allocated (the new rosters)")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare the memory footprint of the dict-of-dicts activity store with the
+``Activity`` model.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+"""
+
+import tracemalloc
+
+from src.models import Activity
+
+NUM_ACTIVITIES = 5_000
+PARTICIPANTS_PER_ACTIVITY = 40
+NUM_STUDENTS = 20_000
+
+
+def make_catalog():
+    """Build raw activity data; emails are fresh strings, as if parsed from requests."""
+    catalog = {}
+    for i in range(NUM_ACTIVITIES):
+        catalog[f"Activity {i}"] = {
+            "description": f"Description of activity {i}",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": PARTICIPANTS_PER_ACTIVITY * 2,
+            "participants": [
+                f"student{(i * 7 + j) % NUM_STUDENTS}@mergington.edu"
+                for j in range(PARTICIPANTS_PER_ACTIVITY)
+            ],
+        }
+    return catalog
+
+
+def measure(build):
+    tracemalloc.start()
+    store = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size
+
+
+def main():
+    _, dict_size = measure(make_catalog)
+
+    def build_models():
+        return {
+            name: Activity.from_dict(name, details)
+            for name, details in make_catalog().items()
+        }
+
+    _, model_size = measure(build_models)
+
+    print(f"{NUM_ACTIVITIES} activities x {PARTICIPANTS_PER_ACTIVITY} participants")
+    print(f"  dict of dicts:   {dict_size / 1024 / 1024:8.2f} MiB")
+    print(f"  Activity model:  {model_size / 1024 / 1024:8.2f} MiB")
+    print(f"  saving:          {(1 - model_size / dict_size) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Time activity search against a 50,000-activity catalog held in the
+in-memory store, for selective and broad queries, and the cost of building
+the index when the catalog is loaded.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search
+"""
+
+import random
+import statistics
+import time
+
+from src.storage import MemoryStore
+
+ACTIVITIES = 50_000
+ITERATIONS = 200
+LIMIT = 20
+
+SUBJECTS = (
+    "chess robotics debate drama art music choir band soccer tennis swimming "
+    "volleyball coding chemistry physics biology poetry journalism photography "
+    "film dance yoga hiking gardening cooking baking astronomy history latin "
+    "spanish french german japanese chinese theater sculpture pottery knitting"
+).split()
+KINDS = ("Club", "Team", "Society", "Workshop", "Class", "Circle", "Lab", "League")
+VERBS = "learn practice explore compete build study perform create discuss master".split()
+DAYS = ("Mondays", "Tuesdays", "Wednesdays", "Thursdays", "Fridays", "Saturdays")
+
+QUERIES = {
+    "one name": None,
+    "two words": "chess tournaments",
+    "day + subject": "friday pottery",
+    "common word": "club",
+}
+
+
+def make_catalog():
+    rng = random.Random(0)
+    catalog = {}
+    for i in range(ACTIVITIES):
+        subject = rng.choice(SUBJECTS)
+        days = " and ".join(sorted(rng.sample(DAYS, rng.randint(1, 2)), key=DAYS.index))
+        hour = rng.randint(1, 5)
+        catalog[f"{subject.title()} {rng.choice(KINDS)} {i}"] = {
+            "description": (
+                f"{rng.choice(VERBS).title()} {subject} and {rng.choice(SUBJECTS)} "
+                f"with {rng.choice(SUBJECTS)} {rng.choice(['tournaments', 'projects', 'shows'])}"
+            ),
+            "schedule": f"{days}, {hour}:00 PM - {hour + 1}:30 PM",
+            "max_participants": 20,
+            "participants": [],
+        }
+    return catalog
+
+
+def main():
+    catalog = make_catalog()
+    store = MemoryStore()
+    start = time.perf_counter()
+    store.load(catalog)
+    print(f"{ACTIVITIES} activities, index built with the catalog in "
+          f"{time.perf_counter() - start:.2f} s; top {LIMIT} results")
+
+    for label, query in QUERIES.items():
+        query = query or next(iter(catalog)).lower()
+        timings = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            results = store.search(query, fields=["schedule"], limit=LIMIT)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        matches = len(store._search.search(query))
+        print(f"{label:<14} {query!r:<22} {matches:>6} matches   "
+              f"p50 {statistics.median(timings):7.3f} ms   "
+              f"p99 {timings[int(len(timings) * 0.99)]:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
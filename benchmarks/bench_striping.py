@@ -0,0 +1,69 @@
+"""
+Compare write throughput with one global lock and with per-activity lock
+stripes as the number of distinct hot activities grows.
+
+Pure in-memory signups are CPU-bound, so under the GIL they cannot overlap
+whatever the locking. To measure the locking layer itself, each signup here
+also spends ``HOLD_SECONDS`` in a GIL-releasing wait while its activity is
+locked, standing in for I/O or a free-threaded build.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_striping
+"""
+
+import threading
+import time
+
+from src.storage import MemoryStore
+
+THREADS = 16
+SIGNUPS_PER_THREAD = 200
+HOLD_SECONDS = 0.0002
+
+
+class HoldingStore(MemoryStore):
+    def _changed(self, op, activity_name, email):
+        super()._changed(op, activity_name, email)
+        time.sleep(HOLD_SECONDS)
+
+
+def make_catalog(hot_activities):
+    return {
+        f"Activity {i}": {
+            "description": "Registration week",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": THREADS * SIGNUPS_PER_THREAD,
+            "participants": [],
+        }
+        for i in range(hot_activities)
+    }
+
+
+def run(lock_stripes, hot_activities):
+    store = HoldingStore(lock_stripes=lock_stripes)
+    store.load(make_catalog(hot_activities))
+
+    def worker(n):
+        activity = f"Activity {n % hot_activities}"
+        for i in range(SIGNUPS_PER_THREAD):
+            store.signup(activity, f"s{n}-{i}@mergington.edu")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return THREADS * SIGNUPS_PER_THREAD / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{THREADS} writer threads, {HOLD_SECONDS * 1e6:.0f} us held per signup")
+    print(f"{'hot activities':>15} {'global lock':>14} {'64 stripes':>14}")
+    for hot in (1, 2, 4, 8, 16):
+        print(f"{hot:>15} {run(1, hot):>12,.0f}/s {run(64, hot):>12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare payload size and latency of GET /activities/summary with the full
+GET /activities catalog, both cold (first request after a change) and warm
+(served from the version cache).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_summary
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+
+ACTIVITIES = 1_000
+PARTICIPANTS_PER_ACTIVITY = 40
+ITERATIONS = 20
+
+
+def make_catalog():
+    return {
+        f"Activity {i}": {
+            "description": f"Description of activity {i}",
+            "schedule": "Mondays, 3:30 PM - 5:00 PM",
+            "max_participants": PARTICIPANTS_PER_ACTIVITY * 2,
+            "participants": [
+                f"student{i}-{j}@mergington.edu" for j in range(PARTICIPANTS_PER_ACTIVITY)
+            ],
+        }
+        for i in range(ACTIVITIES)
+    }
+
+
+def measure(client, url):
+    cold = 0.0
+    for i in range(ITERATIONS):
+        # Each signup bumps the store version, so the next read rebuilds
+        client.post(f"/activities/Activity {i}/signup?email=bench{i}@mergington.edu")
+        start = time.perf_counter()
+        client.get(url)
+        cold += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        response = client.get(url)
+    warm = time.perf_counter() - start
+    return len(response.content), cold / ITERATIONS * 1000, warm / ITERATIONS * 1000
+
+
+def main():
+    app_module.load_activities(make_catalog())
+    client = TestClient(app_module.app)
+    print(f"{ACTIVITIES} activities x {PARTICIPANTS_PER_ACTIVITY} participants")
+    for url in ("/activities", "/activities/summary"):
+        size, cold, warm = measure(client, url)
+        print(f"{url:<22} {size / 1024:9,.1f} KiB   cold {cold:8.2f} ms   warm {warm:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,42 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+import asyncio
+import hashlib
+import json
 import os
 from pathlib import Path
+from typing import Annotated
+
+from src.cache import (
+    CachedBody,
+    IdempotencyCache,
+    IdempotencyKeyReusedError,
+    ResponseCache,
+    encode_json,
+    make_etag,
+)
+from src.events import Broadcaster, CapacityFeed, resync_event, stream_events
+from src.exporter import MEDIA_TYPES, export_chunks
+from src.importer import FORMATS, RosterImport
+from src.models import ACTIVITY_FIELDS
+from src.schedule import parse_day, parse_time, parse_time_range, week_windows
+
+from src.storage import (
+    ActivityFullError,
+    ActivityNotFoundError,
+    AlreadySignedUpError,
+    InvalidCursorError,
+    NotSignedUpError,
+    ScheduleConflictError,
+    StorageError,
+    open_store,
+)
 
 app = FastAPI(title="Mergington High School API",
               description="API for viewing and signing up for extracurricular activities")
@@ -19,8 +50,18 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
-activities = {
+# Activity database: a SQLite file shared by all workers when ACTIVITIES_DB
+# is set, an in-memory store backed by a write-ahead log in ACTIVITIES_JOURNAL,
+# otherwise a plain per-process in-memory store. ACTIVITIES_DURABILITY picks
+# when persistent writes are acknowledged: fsync (default), batched or async
+store = open_store(
+    db_path=os.environ.get("ACTIVITIES_DB"),
+    journal_dir=os.environ.get("ACTIVITIES_JOURNAL"),
+    durability=os.environ.get("ACTIVITIES_DURABILITY", "fsync"),
+)
+
+# Seed data loaded into the activity database at startup
+INITIAL_ACTIVITIES = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
@@ -78,49 +119,639 @@ activities = {
 }
 
 
+def load_activities(data):
+    """Replace the contents of the activity database with the given data."""
+    store.load(data)
+    # Remembered outcomes describe the old contents
+    idempotency_cache.clear()
+
+
+store.seed(INITIAL_ACTIVITIES)
+
+# Encoded response bodies, rebuilt only after the store version changes
+response_cache = ResponseCache()
+
+# Responses to mutating requests that carried an Idempotency-Key, replayed
+# when a client retries. Per process: with several workers a retry that
+# lands on another worker runs again, as it would without a key
+idempotency_cache = IdempotencyCache()
+IdempotencyKey = Annotated[str | None, Header(min_length=1, max_length=255)]
+
+
+async def call_store(method, *args):
+    """Call a store method without blocking the event loop.
+
+    Non-blocking stores run inline on the event loop, saving the thread pool
+    hop; their locks are only held for a few dict operations and never across
+    an ``await``. Blocking stores (disk or database I/O) run in the pool.
+    """
+    if store.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value matches ``etag``"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(request, entry, headers=None):
+    """Serve a cached body, or a body-less 304 if the client already has it"""
+    headers = {**(headers or {}), "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def json_response(request, content, headers=None):
+    """Encode an uncached payload and serve it with an ETag"""
+    body = encode_json(content)
+    return cached_json_response(request, CachedBody(None, body, make_etag(body)), headers)
+
+
+async def request_fingerprint(request):
+    """Digest of what a request asks for, to catch an Idempotency-Key reused for another one"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{request.method} {request.url.path}?".encode())
+    digest.update(str(sorted(request.query_params.multi_items())).encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def idempotent(request, idempotency_key, handler):
+    """Run ``handler`` once per Idempotency-Key and replay its response to retries
+
+    Without a key the handler just runs. Client errors are stored and
+    replayed like successes, since retrying would not change them; server
+    errors are not, so the retry runs again. Replays carry an
+    ``Idempotent-Replayed: true`` header.
+    """
+    if idempotency_key is None:
+        return await handler()
+
+    async def execute():
+        try:
+            return 200, encode_json(await handler())
+        except HTTPException as error:
+            if error.status_code >= 500:
+                raise
+            return error.status_code, encode_json({"detail": error.detail})
+
+    fingerprint = await request_fingerprint(request)
+    try:
+        status_code, body, replayed = await idempotency_cache.run(
+            idempotency_key, fingerprint, execute
+        )
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        )
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def parse_fields(fields):
+    """Split a comma-separated fields= parameter, rejecting unknown names"""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="fields= must name at least one field")
+    unknown = [name for name in names if name not in ACTIVITY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def parse_schedule_filter(day, at, between):
+    """Week-minute windows for the day=, at= and between= parameters, if any"""
+    if day is None and at is None and between is None:
+        return None
+    if at is not None and between is not None:
+        raise HTTPException(status_code=400, detail="Use either at or between, not both")
+    try:
+        days = [parse_day(day)] if day is not None else range(7)
+        if at is not None:
+            start = parse_time(at)
+            return week_windows(days, start, start + 1)
+        if between is not None:
+            return week_windows(days, *parse_time_range(between))
+        return week_windows(days)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+async def fetch_changes(since):
+    return await call_store(store.get_changes, since)
+
+
+# Pushes change events to Server-Sent Events subscribers
+broadcaster = Broadcaster(fetch_changes)
+
+CAPACITY_FIELDS = ["participant_count", "max_participants", "spots_left"]
+
+
+def read_capacities(names):
+    """The store version and each named activity's seat counts (None if unknown)"""
+    version = store.version
+    capacities = {}
+    for name in names:
+        try:
+            capacities[name] = store.get_activity(name, CAPACITY_FIELDS)
+        except ActivityNotFoundError:
+            capacities[name] = None
+    return version, capacities
+
+
+async def fetch_capacities(names):
+    return await call_store(read_capacities, names)
+
+
+# Pushes coalesced seat counts to WebSocket subscribers
+capacity_feed = CapacityFeed(broadcaster, fetch_capacities)
+
+
 @app.get("/")
-def root():
+async def root():
     return RedirectResponse(url="/static/index.html")
 
 
+@app.get("/status")
+async def get_status():
+    """Report which storage backend and durability mode are in use"""
+    return {"backend": store.backend, "durability": store.durability}
+
+
 @app.get("/activities")
-def get_activities():
-    return activities
+async def get_activities(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=1000),
+    cursor: str | None = None,
+    fields: str | None = None,
+    has_openings: bool = False,
+    day: str | None = None,
+    at: str | None = None,
+    between: str | None = None,
+):
+    """List activities, optionally paginated, filtered and projected
 
+    ``day`` (e.g. monday), ``at`` (e.g. 16:00 or 4pm) and ``between``
+    (e.g. 15:00-17:00) keep only activities meeting then; without ``day``
+    the times apply to any day. The cursor for the next page, if any, is
+    returned in the X-Next-Cursor header so the body keeps the same shape as
+    the full catalog.
+    """
+    during = parse_schedule_filter(day, at, between)
+    if (limit is None and cursor is None and fields is None and not has_openings
+            and during is None):
+        return cached_json_response(request, await call_store(activities_body))
 
-@app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
-    """Sign up a student for an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
+    field_names = parse_fields(fields)
+    try:
+        page, next_cursor = await call_store(
+            store.query_activities, field_names, has_openings, cursor, limit, during
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(request, page, headers)
+
+
+def activities_body():
+    """Cached GET /activities payload for the current store version"""
+    return response_cache.get("activities", store.version, store.list_activities)
+
+
+@app.get("/activities/summary")
+async def get_activities_summary(request: Request):
+    """Seat counts for every activity, without participant emails"""
+    return cached_json_response(request, await call_store(summary_body))
+
+
+def summary_body():
+    """Cached GET /activities/summary payload for the current store version"""
+    def build():
+        page, _ = store.query_activities(fields=["participant_count", "max_participants"])
+        return [{"name": name, **counts} for name, counts in page.items()]
+
+    return response_cache.get("summary", store.version, build)
+
+
+@app.get("/activities/changes")
+async def get_activity_changes(since: int):
+    """Changes since a store version, or a full snapshot if the client is too far behind
+
+    Returns ``{"version": v, "changes": [...]}`` when every change after
+    ``since`` is still held, otherwise ``{"version": v, "snapshot": {...}}``.
+    Either way, the client should pass ``v`` as ``since`` next time.
+    """
+    version, changes = await call_store(store.get_changes, since)
+    if changes is not None:
+        return {"version": version, "changes": changes}
+    # Read the version before the snapshot: the snapshot may include later
+    # changes, which are then harmlessly replayed on the next sync
+    snapshot = await call_store(store.list_activities)
+    return {"version": version, "snapshot": snapshot}
+
+
+@app.get("/activities/search")
+async def search_activities(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=1000),
+    fields: str | None = None,
+):
+    """Activities whose name, description or schedule contain every word of q, best match first"""
+    field_names = parse_fields(fields)
+    return await call_store(store.search, q, field_names, limit)
+
+
+@app.get("/activities/events")
+async def stream_activity_events(request: Request):
+    """Server-Sent Events stream of signups and unregistrations
+
+    Each event's id is the store version it produced. A reconnecting client's
+    Last-Event-ID is used to replay what it missed; a ``resync`` event means
+    the client fell behind and should reload the catalog.
+    """
+    version = await call_store(lambda: store.version)
+    subscription = broadcaster.subscribe(version)
+
+    backlog = []
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        _, missed = await fetch_changes(int(last_event_id))
+        backlog = missed if missed is not None else [resync_event(version)]
+
+    return StreamingResponse(
+        stream_events(broadcaster, subscription, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def parse_subscription(text):
+    """Split a WebSocket message into the activity names to watch and to unwatch"""
+    try:
+        message = json.loads(text)
+    except ValueError:
+        raise ValueError("Expected a JSON object")
+    if not isinstance(message, dict):
+        raise ValueError("Expected a JSON object")
+    lists = [message.get(key, []) for key in ("subscribe", "unsubscribe")]
+    for names in lists:
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ValueError("Expected lists of activity names")
+    return lists
+
+
+async def send_capacity_updates(websocket, channel):
+    async for capacities in channel.updates():
+        await websocket.send_json(capacities)
+
+
+@app.websocket("/activities/live")
+async def live_capacities(websocket: WebSocket):
+    """Push seat counts for the activities a client subscribes to
+
+    Clients send ``{"subscribe": [...], "unsubscribe": [...]}`` messages and
+    receive ``{name: {"participant_count", "max_participants", "spots_left"}}``
+    objects, ``null`` for unknown activities. Updates are coalesced to a few
+    per second per activity however busy signups get.
+    """
+    await websocket.accept()
+    channel = capacity_feed.connect()
+    sender = asyncio.create_task(send_capacity_updates(websocket, channel))
+    try:
+        while True:
+            try:
+                subscribe, unsubscribe = parse_subscription(await websocket.receive_text())
+            except ValueError as error:
+                await websocket.send_json({"error": str(error)})
+                continue
+            capacity_feed.unwatch(channel, unsubscribe)
+            capacity_feed.watch(channel, subscribe)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        capacity_feed.disconnect(channel)
+        sender.cancel()
+
+
+@app.get("/activities/{activity_name}")
+async def get_activity(request: Request, activity_name: str, fields: str | None = None):
+    """Get a single activity, optionally projected onto some fields"""
+    field_names = parse_fields(fields)
+    try:
+        if field_names is None:
+            return cached_json_response(request, await call_store(activity_body, activity_name))
+        return json_response(
+            request, await call_store(store.get_activity, activity_name, field_names)
+        )
+    except ActivityNotFoundError:
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
 
-# Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student already signed up for this activity")
+def activity_body(activity_name):
+    """Cached GET /activities/{activity_name} payload for the current store version"""
+    return response_cache.get(
+        ("activity", activity_name),
+        store.version,
+        lambda: store.get_activity(activity_name),
+    )
 
-    # Add student
-    activity["participants"].append(email)
-    return {"message": f"Signed up {email} for {activity_name}"}
 
+@app.get("/activities/{activity_name}/participants")
+async def get_activity_participants(
+    request: Request,
+    activity_name: str,
+    limit: int | None = Query(None, ge=1, le=1000),
+    cursor: str | None = None,
+):
+    """Page through an activity's roster in signup order
 
-@app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
-    """Unregister a student from an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    """
+    try:
+        page, next_cursor = await call_store(store.get_participants, activity_name, cursor, limit)
+    except ActivityNotFoundError:
         raise HTTPException(status_code=404, detail="Activity not found")
-    
-    # Get the specific activity
-    activity = activities[activity_name]
-    
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student is not signed up for this activity")
-    
-    # Remove student
-    activity["participants"].remove(email)
-    return {"message": f"Unregistered {email} from {activity_name}"}
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(request, page, headers)
+
+
+def signup_error(error):
+    """Status code and detail reported for a storage error raised by a signup"""
+    if isinstance(error, ActivityNotFoundError):
+        return 404, "Activity not found"
+    if isinstance(error, AlreadySignedUpError):
+        return 400, "Student already signed up for this activity"
+    if isinstance(error, ActivityFullError):
+        return 409, "Activity is full"
+    if isinstance(error, ScheduleConflictError):
+        return 409, f"Schedule conflicts with {', '.join(error.conflicts)}"
+    raise error
+
+
+def signup_result(activity_name, email, conflicts):
+    result = {"message": f"Signed up {email} for {activity_name}"}
+    if conflicts:
+        result["conflicts"] = conflicts
+    return result
+
+
+@app.post("/activities/{activity_name}/signup")
+async def signup_for_activity(
+    request: Request,
+    activity_name: str,
+    email: str,
+    allow_conflicts: bool = False,
+    idempotency_key: IdempotencyKey = None,
+):
+    """Sign up a student for an activity
+
+    Signing up for an activity that meets at the same time as one of the
+    student's others is refused, unless ``allow_conflicts`` is set, in which
+    case the clashing activities are listed in the response. A retry with
+    the same Idempotency-Key gets the original response back.
+    """
+    async def handler():
+        try:
+            conflicts = await call_store(store.signup, activity_name, email, allow_conflicts)
+        except StorageError as error:
+            status_code, detail = signup_error(error)
+            raise HTTPException(status_code=status_code, detail=detail)
+        broadcaster.notify()
+        return signup_result(activity_name, email, conflicts)
+
+    return await idempotent(request, idempotency_key, handler)
+
+
+# Largest number of signups accepted in one batch request
+MAX_BATCH = 1000
+
+
+class BatchSignup(BaseModel):
+    emails: list[str] = Field(max_length=MAX_BATCH)
+    allow_conflicts: bool = False
+
+
+class ActivitySignup(BaseModel):
+    activity: str
+    email: str
+
+
+class CrossActivitySignup(BaseModel):
+    signups: list[ActivitySignup] = Field(max_length=MAX_BATCH)
+    allow_conflicts: bool = False
+
+
+async def signup_batch(signups, allow_conflicts):
+    """Apply (activity, email) pairs in one store call and report each one's outcome"""
+    outcomes = await call_store(store.signup_many, signups, allow_conflicts)
+    results = []
+    for (activity_name, email), outcome in zip(signups, outcomes):
+        result = {"activity": activity_name, "email": email}
+        if isinstance(outcome, StorageError):
+            status_code, detail = signup_error(outcome)
+            result.update(status=status_code, detail=detail)
+        else:
+            result.update(status=200, **signup_result(activity_name, email, outcome))
+        results.append(result)
+
+    signed_up = sum(result["status"] == 200 for result in results)
+    if signed_up:
+        broadcaster.notify()
+    return {"signed_up": signed_up, "results": results}
+
+
+@app.post("/activities/signup:batch")
+async def signup_across_activities(
+    request: Request, batch: CrossActivitySignup, idempotency_key: IdempotencyKey = None
+):
+    """Sign up students for several activities in one request
+
+    Every activity involved is locked once for the whole batch. Each item
+    gets the status code and message a single signup would have returned.
+    """
+    signups = [(item.activity, item.email) for item in batch.signups]
+    return await idempotent(
+        request, idempotency_key, lambda: signup_batch(signups, batch.allow_conflicts)
+    )
+
+
+@app.post("/activities/{activity_name}/signup:batch")
+async def signup_many_for_activity(
+    request: Request,
+    activity_name: str,
+    batch: BatchSignup,
+    idempotency_key: IdempotencyKey = None,
+):
+    """Sign up a list of students for one activity, e.g. a whole homeroom
+
+    The activity is locked once for the whole batch. Each email gets the
+    status code and message a single signup would have returned.
+    """
+    async def handler():
+        result = await signup_batch([(activity_name, email) for email in batch.emails],
+                                    batch.allow_conflicts)
+        if any(item["status"] == 404 for item in result["results"]):
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return result
+
+    return await idempotent(request, idempotency_key, handler)
+
+
+@app.delete("/activities/{activity_name}/unregister")
+async def unregister_from_activity(
+    request: Request, activity_name: str, email: str, idempotency_key: IdempotencyKey = None
+):
+    """Unregister a student from an activity
+
+    A retry with the same Idempotency-Key gets the original response back.
+    """
+    async def handler():
+        try:
+            await call_store(store.unregister, activity_name, email)
+        except ActivityNotFoundError:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        except NotSignedUpError:
+            raise HTTPException(
+                status_code=400, detail="Student is not signed up for this activity"
+            )
+        broadcaster.notify()
+        return {"message": f"Unregistered {email} from {activity_name}"}
+
+    return await idempotent(request, idempotency_key, handler)
+
+
+class BatchUnregister(BaseModel):
+    emails: list[str] = Field(max_length=MAX_BATCH)
+
+
+def unregister_results(activity_name, emails, outcomes):
+    results = []
+    for email, outcome in zip(emails, outcomes):
+        result = {"email": email}
+        if outcome is None:
+            result.update(status=200, message=f"Unregistered {email} from {activity_name}")
+        else:
+            result.update(status=400, detail="Student is not signed up for this activity")
+        results.append(result)
+
+    unregistered = sum(result["status"] == 200 for result in results)
+    if unregistered:
+        broadcaster.notify()
+    return {"unregistered": unregistered, "results": results}
+
+
+@app.post("/activities/{activity_name}/unregister:batch")
+async def unregister_many_from_activity(
+    request: Request,
+    activity_name: str,
+    batch: BatchUnregister,
+    idempotency_key: IdempotencyKey = None,
+):
+    """Unregister a list of students from an activity in one pass
+
+    Each email gets the status code and message a single unregister would
+    have returned.
+    """
+    async def handler():
+        try:
+            outcomes = await call_store(store.unregister_many, activity_name, batch.emails)
+        except ActivityNotFoundError:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return unregister_results(activity_name, batch.emails, outcomes)
+
+    return await idempotent(request, idempotency_key, handler)
+
+
+@app.delete("/activities/{activity_name}/participants")
+async def clear_activity_roster(
+    request: Request, activity_name: str, idempotency_key: IdempotencyKey = None
+):
+    """Unregister everyone from an activity, e.g. at the end of term"""
+    async def handler():
+        try:
+            removed = await call_store(store.clear_roster, activity_name)
+        except ActivityNotFoundError:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return unregister_results(activity_name, removed, [None] * len(removed))
+
+    return await idempotent(request, idempotency_key, handler)
+
+
+# Content types accepted by POST /activities/import without format=
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@app.post("/activities/import")
+async def import_roster(
+    request: Request, format: str | None = None, allow_conflicts: bool = False
+):
+    """Enroll students from a CSV or NDJSON export streamed in the request body
+
+    The body is parsed as it arrives and applied in batches, so files of any
+    size are imported in bounded memory. Returns counts of accepted,
+    duplicate, unknown-activity, full, conflicting and invalid rows, plus the
+    line numbers of the first rejected rows.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    format = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=400, detail="Send text/csv or application/x-ndjson, or pass format="
+        )
+
+    roster_import = RosterImport(format)
+
+    async def apply(batches):
+        for rows in batches:
+            signups = [(activity, email) for _, activity, email in rows]
+            outcomes = await call_store(store.signup_many, signups, allow_conflicts)
+            roster_import.record(rows, outcomes)
+            if any(not isinstance(outcome, StorageError) for outcome in outcomes):
+                broadcaster.notify()
+
+    try:
+        async for data in request.stream():
+            await apply(roster_import.feed(data))
+        await apply(roster_import.finish())
+    except ValueError as error:
+        # Batches before the error stay applied; report them with the error
+        raise HTTPException(
+            status_code=400, detail={"error": str(error), "summary": roster_import.summary()}
+        )
+    return roster_import.summary()
+
+
+@app.get("/export")
+async def export_rosters(format: str = "csv"):
+    """Every roster as of the start of the request, streamed as CSV, NDJSON or JSON
+
+    CSV and NDJSON have one activity/email row per enrollment and can be fed
+    back to POST /activities/import; JSON matches GET /activities. Signups
+    made while the export is streaming are not included.
+    """
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be csv, ndjson or json")
+    return StreamingResponse(
+        export_chunks(store.export(), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="rosters.{format}"'},
+    )
+
+
+@app.get("/students/{email}/activities")
+async def get_student_activities(email: str):
+    """List the activities a student is signed up for, in signup order"""
+    return await call_store(store.get_student_activities, email)
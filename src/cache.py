@@ -0,0 +1,166 @@
+"""
+Caches of pre-encoded JSON response bodies: the latest body of each read
+view, invalidated by store version, and the responses to recent mutating
+requests, replayed when a client retries with the same Idempotency-Key.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# An encoded body, the store version it was built at, and its strong ETag
+CachedBody = namedtuple("CachedBody", ["version", "body", "etag"])
+
+# A stored response, the fingerprint of the request that produced it, and
+# when it expires
+StoredResponse = namedtuple(
+    "StoredResponse", ["fingerprint", "status_code", "body", "expires", "size"]
+)
+# Rough bookkeeping cost of one stored response beyond its key and body
+ENTRY_OVERHEAD = 256
+
+
+def encode_json(content):
+    """Encode content the way FastAPI's JSONResponse does."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def make_etag(body):
+    """Strong ETag for an encoded body.
+
+    Hashing the bytes (once per store version) rather than quoting the
+    version keeps the tag exact even if a concurrent write landed while the
+    body was built, and keeps it valid across restarts.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """Keeps the latest encoded body and ETag for each view, tagged with its store version.
+
+    Callers must read the store version *before* building the content: the
+    content is then at least as new as the version it is cached under, so a
+    cached body is never older than the version that serves it.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """Return the ``CachedBody`` for ``key`` at ``version``, calling ``build`` on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+
+        body = encode_json(build())
+        entry = CachedBody(version, body, make_etag(body))
+        with self._lock:
+            current = self._entries.get(key)
+            # A slower reader must not replace a body built from a newer version
+            if current is None or current.version <= version:
+                self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class IdempotencyKeyReusedError(Exception):
+    """An Idempotency-Key was sent again with a different request."""
+
+
+class IdempotencyCache:
+    """Responses to recent requests by Idempotency-Key, for replaying to retries.
+
+    Entries expire ``ttl`` seconds after they are stored, and the least
+    recently used are evicted once there are more than ``max_entries`` or
+    their keys and bodies take more than ``max_bytes``. Used only from the
+    event loop, so it needs no lock.
+    """
+
+    def __init__(self, ttl=3600, max_entries=10_000, max_bytes=16 * 2**20, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size = 0
+        self._entries = OrderedDict()
+        # Keys whose first request is still running, and the event set when it ends
+        self._running = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the live ``StoredResponse`` for ``key``, or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self.clock():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, fingerprint, status_code, body):
+        size = ENTRY_OVERHEAD + len(key) + len(body)
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = StoredResponse(
+            fingerprint, status_code, body, self.clock() + self.ttl, size
+        )
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    async def run(self, key, fingerprint, execute):
+        """Return ``(status_code, body, replayed)`` for one request carrying ``key``.
+
+        The first request runs ``execute``, a coroutine function returning
+        ``(status_code, body)``, and its response is stored; repeats get the
+        stored response without running anything. A repeat arriving while the
+        first is still running waits for it. If ``execute`` raises, nothing
+        is stored and the next request with the key runs again. Reusing a key
+        for a request with a different ``fingerprint`` raises
+        ``IdempotencyKeyReusedError``.
+        """
+        while True:
+            entry = self.get(key)
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyKeyReusedError(key)
+                return entry.status_code, entry.body, True
+            running = self._running.get(key)
+            if running is None:
+                break
+            await running.wait()
+
+        done = self._running[key] = asyncio.Event()
+        try:
+            status_code, body = await execute()
+            self.put(key, fingerprint, status_code, body)
+        finally:
+            del self._running[key]
+            done.set()
+        return status_code, body, False
@@ -0,0 +1,230 @@
+"""
+Fan-out of roster change events to live subscribers.
+"""
+
+import asyncio
+import json
+
+
+def resync_event(version):
+    """Event telling a subscriber it missed changes and must reload."""
+    return {"version": version, "op": "resync"}
+
+
+def format_sse(event):
+    """Encode a change event as a Server-Sent Events message."""
+    data = json.dumps(event, separators=(",", ":"))
+    return f"id: {event['version']}\nevent: {event['op']}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """A subscriber's bounded queue of pending events."""
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(size)
+        # Set when the queue overflowed; the subscriber must resync
+        self.dropped = False
+
+
+class Broadcaster:
+    """Pushes store change events to every subscriber without blocking writers.
+
+    Writers only call ``notify``. A single pump task then reads the new
+    events from the store's change feed, which also picks up changes made by
+    other workers sharing the store (polled every ``poll_interval`` seconds),
+    and offers each event to every subscriber with ``put_nowait``. A
+    subscriber whose queue is full is dropped and told to resync rather than
+    slowing anyone else down.
+    """
+
+    def __init__(self, fetch_changes, queue_size=256, poll_interval=1.0):
+        # Coroutine function returning (version, changes or None) for a version
+        self._fetch_changes = fetch_changes
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.version = None
+        self._subscribers = set()
+        self._wakeup = asyncio.Event()
+        self._pump = None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def notify(self):
+        """Signal that the store changed; never blocks."""
+        if self._pump is not None:
+            self._wakeup.set()
+
+    def subscribe(self, version):
+        """Register a subscriber that has seen the store up to ``version``."""
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        loop = asyncio.get_running_loop()
+        if self._pump is None or self._pump.done() or self._pump.get_loop() is not loop:
+            self.version = version
+            self._wakeup = asyncio.Event()
+            self._pump = loop.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        """Offer an event to every subscriber, dropping those that are full."""
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self._subscribers.discard(subscription)
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            version, changes = await self._fetch_changes(self.version)
+            if changes is None:
+                self.publish(resync_event(version))
+            else:
+                for change in changes:
+                    self.publish(change)
+            self.version = version
+
+
+async def stream_events(broadcaster, subscription, backlog=(), keepalive=15.0):
+    """Yield Server-Sent Events for a subscription until it must resync.
+
+    ``backlog`` holds events to send before live ones, e.g. those missed
+    since the client's Last-Event-ID.
+    """
+    try:
+        for event in backlog:
+            yield format_sse(event)
+            if event["op"] == "resync":
+                return
+        while True:
+            if subscription.dropped and subscription.queue.empty():
+                yield format_sse(resync_event(broadcaster.version))
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+            if event["op"] == "resync":
+                return
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+class CapacityChannel:
+    """One WebSocket connection's watched activities and unsent updates."""
+
+    __slots__ = ("activities", "pending", "ready")
+
+    def __init__(self):
+        self.activities = set()
+        # Latest capacity per activity not yet sent; newer values overwrite
+        # older ones, so a slow client never holds more than one per activity
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def offer(self, capacities):
+        self.pending.update(capacities)
+        self.ready.set()
+
+    async def updates(self):
+        """Yield batches of pending capacities as they become available."""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            pending, self.pending = self.pending, {}
+            yield pending
+
+
+class CapacityFeed:
+    """Coalesced per-activity capacity updates for WebSocket subscribers.
+
+    A single task follows the broadcaster's change events and marks the
+    changed activities dirty. Every ``1 / updates_per_second`` seconds it
+    reads each dirty activity that someone watches, once, and offers the
+    result to all its watchers. However often an activity changes, watchers
+    get at most ``updates_per_second`` updates a second for it, and an idle
+    connection costs only its channel.
+    """
+
+    def __init__(self, broadcaster, read_capacities, updates_per_second=4):
+        self.broadcaster = broadcaster
+        # Coroutine function returning (version, {name: capacity or None})
+        self._read_capacities = read_capacities
+        self.interval = 1 / updates_per_second
+        self._watchers = {}
+        self._dirty = set()
+        self._task = None
+
+    @property
+    def watched_count(self):
+        return len(self._watchers)
+
+    def connect(self):
+        return CapacityChannel()
+
+    def disconnect(self, channel):
+        self.unwatch(channel, list(channel.activities))
+
+    def watch(self, channel, names):
+        """Subscribe a channel to activities; their current capacity follows on the next tick."""
+        for name in names:
+            channel.activities.add(name)
+            self._watchers.setdefault(name, set()).add(channel)
+        self._dirty.update(names)
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def unwatch(self, channel, names):
+        for name in names:
+            channel.activities.discard(name)
+            watchers = self._watchers.get(name)
+            if watchers is not None:
+                watchers.discard(channel)
+                if not watchers:
+                    del self._watchers[name]
+
+    async def _run(self):
+        subscription = None
+        try:
+            while self._watchers:
+                if subscription is None or subscription.dropped:
+                    # Events may have been missed; refresh everything watched
+                    version, _ = await self._read_capacities([])
+                    if subscription is not None:
+                        self.broadcaster.unsubscribe(subscription)
+                    subscription = self.broadcaster.subscribe(version)
+                    self._dirty.update(self._watchers)
+
+                await asyncio.sleep(self.interval)
+                while not subscription.queue.empty():
+                    event = subscription.queue.get_nowait()
+                    if event["op"] == "resync":
+                        self._dirty.update(self._watchers)
+                    else:
+                        self._dirty.add(event["activity"])
+
+                dirty = [name for name in self._dirty if name in self._watchers]
+                self._dirty.clear()
+                if dirty:
+                    _, capacities = await self._read_capacities(dirty)
+                    for name, capacity in capacities.items():
+                        for channel in self._watchers.get(name, ()):
+                            channel.offer({name: capacity})
+        finally:
+            if subscription is not None:
+                self.broadcaster.unsubscribe(subscription)
@@ -0,0 +1,64 @@
+"""
+Streaming roster export.
+
+Serializes the activities yielded by ``ActivityStore.export`` into chunks of
+about ``CHUNK_BYTES``, so memory stays bounded by one activity however large
+the catalog. CSV and NDJSON hold one ``activity``/``email`` row per
+enrollment, the format ``src.importer`` reads back; JSON is the same object
+GET /activities returns.
+"""
+
+import csv
+import io
+from contextlib import closing
+
+from src.cache import encode_json
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "json": "application/json"}
+CHUNK_BYTES = 64 * 1024
+
+
+def _csv(activities):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["activity", "email"])
+    for name, details in activities:
+        writer.writerows((name, email) for email in details["participants"])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _ndjson(activities):
+    for name, details in activities:
+        yield b"".join(
+            encode_json({"activity": name, "email": email}) + b"\n"
+            for email in details["participants"]
+        )
+
+
+def _json(activities):
+    separator = b"{"
+    for name, details in activities:
+        yield separator + encode_json(name) + b":" + encode_json(details)
+        separator = b","
+    yield b"}" if separator == b"," else b"{}"
+
+
+WRITERS = {"csv": _csv, "ndjson": _ndjson, "json": _json}
+
+
+def export_chunks(activities, format):
+    """Yield ``activities`` serialized as ``format``, closing them when done."""
+    with closing(activities):
+        chunk = []
+        size = 0
+        for piece in WRITERS[format](activities):
+            chunk.append(piece)
+            size += len(piece)
+            if size >= CHUNK_BYTES:
+                yield b"".join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield b"".join(chunk)
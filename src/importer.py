@@ -0,0 +1,276 @@
+"""
+Streaming roster import from CSV or NDJSON enrollment exports.
+
+The input is parsed as it arrives, a chunk at a time, and rows are applied
+with ``signup_many`` in batches of ``CHUNK_ROWS``, so memory stays bounded by
+one batch however large the file. CSV files need a header row with
+``activity`` and ``email`` columns; NDJSON lines are objects with those keys.
+
+Also usable from the command line against the configured persistent store:
+
+    ACTIVITIES_DB=activities.db python -m src.importer enrollments.csv
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import os
+import sys
+
+from src.storage import (
+    ActivityFullError,
+    ActivityNotFoundError,
+    AlreadySignedUpError,
+    ScheduleConflictError,
+    open_store,
+)
+
+FORMATS = ("csv", "ndjson")
+CHUNK_ROWS = 500
+# Rejected rows reported individually; the rest are only counted
+MAX_ERRORS = 100
+# Most lines one CSV record may span before its opening quote is taken to
+# be unterminated
+MAX_RECORD_LINES = 100
+
+OUTCOMES = {
+    AlreadySignedUpError: "duplicate",
+    ActivityNotFoundError: "unknown_activity",
+    ActivityFullError: "full",
+    ScheduleConflictError: "conflict",
+}
+
+
+def _in_quoted_field(text, quoted):
+    """Whether a CSV record is inside a quoted field at the end of line ``text``.
+
+    Follows the ``csv`` module: a quote opens a field only as its first
+    character, ``""`` inside a quoted field is a literal quote, and any other
+    quote is an ordinary character.
+    """
+    if '"' not in text:
+        return quoted
+    field_start, closed = not quoted, False
+    for char in text:
+        if quoted:
+            if char == '"':
+                quoted, closed = False, True
+            continue
+        if char == '"' and (field_start or closed):
+            quoted = True
+        field_start = char == ","
+        closed = False
+    return quoted
+
+
+class RosterImport:
+    """Incremental parser and tally for one import.
+
+    ``feed`` takes raw bytes and returns the batches of ``(line, activity,
+    email)`` rows that are ready to apply; ``finish`` returns the rest.
+    Report each applied batch's outcomes with ``record``.
+    """
+
+    def __init__(self, format, chunk_rows=CHUNK_ROWS):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format: {format}")
+        self.format = format
+        self.chunk_rows = chunk_rows
+        self.counts = {
+            "rows": 0, "accepted": 0, "duplicate": 0, "unknown_activity": 0,
+            "full": 0, "conflict": 0, "invalid": 0,
+        }
+        self.errors = []
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._partial = ""
+        self._line = 0
+        # CSV lines of a record whose quoted field continues on the next line
+        self._record = []
+        self._record_line = 0
+        self._quoted = False
+        self._columns = None
+        self._pending = []
+
+    def feed(self, data):
+        text = self._partial + self._decoder.decode(data)
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        self._parse_lines(lines)
+        return self._take_batches()
+
+    def finish(self):
+        text = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        self._parse_lines([text] if text else [])
+        while self._record:
+            self._abandon_record()
+        batches = self._take_batches()
+        if self._pending:
+            batches.append(self._pending)
+            self._pending = []
+        return batches
+
+    def record(self, rows, outcomes):
+        for (line, _, _), outcome in zip(rows, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = OUTCOMES[type(outcome)]
+                self.counts[outcome] += 1
+                self._error(line, outcome)
+            else:
+                self.counts["accepted"] += 1
+
+    def summary(self):
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {**self.counts, "errors": errors}
+
+    def _take_batches(self):
+        batches = []
+        while len(self._pending) >= self.chunk_rows:
+            batches.append(self._pending[:self.chunk_rows])
+            del self._pending[:self.chunk_rows]
+        return batches
+
+    def _error(self, line, reason):
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "reason": reason})
+
+    def _reject(self, line, reason):
+        self.counts["invalid"] += 1
+        self._error(line, reason)
+
+    def _accept(self, line, activity, email):
+        if not activity or not email:
+            self._reject(line, "missing activity or email")
+        else:
+            self._pending.append((line, activity, email))
+
+    def _parse_lines(self, lines):
+        if self.format == "ndjson":
+            for text in lines:
+                self._line += 1
+                if text.strip():
+                    self._parse_ndjson(self._line, text)
+            return
+
+        for text in lines:
+            self._line += 1
+            self._add_csv_line(self._line, text)
+
+    def _add_csv_line(self, line, text):
+        if not self._record:
+            self._record_line = line
+            self._quoted = False
+        self._record.append(text)
+        self._quoted = _in_quoted_field(text, self._quoted)
+        if not self._quoted:
+            record = "\n".join(self._record)
+            self._record = []
+            if record.strip():
+                self._parse_csv(self._record_line, record)
+        elif len(self._record) > MAX_RECORD_LINES:
+            self._abandon_record()
+
+    def _abandon_record(self):
+        """Reject the open record's first line and reread the lines after it."""
+        record_line, rest = self._record_line, self._record[1:]
+        self._record = []
+        self.counts["rows"] += 1
+        self._reject(record_line, "unterminated quoted field")
+        for offset, text in enumerate(rest, 1):
+            self._add_csv_line(record_line + offset, text)
+
+    def _parse_ndjson(self, line, text):
+        self.counts["rows"] += 1
+        try:
+            row = json.loads(text)
+        except ValueError:
+            self._reject(line, "invalid JSON")
+            return
+        if not isinstance(row, dict):
+            self._reject(line, "expected an object")
+            return
+        activity, email = row.get("activity"), row.get("email")
+        if not isinstance(activity, str) or not isinstance(email, str):
+            self._reject(line, "missing activity or email")
+            return
+        self._accept(line, activity.strip(), email.strip())
+
+    def _parse_csv(self, line, text):
+        fields = next(csv.reader([text]), [])
+        if self._columns is None:
+            header = [field.strip().lower() for field in fields]
+            if "activity" not in header or "email" not in header:
+                raise ValueError("CSV header must name activity and email columns")
+            self._columns = (header.index("activity"), header.index("email"))
+            return
+        self.counts["rows"] += 1
+        activity_column, email_column = self._columns
+        if len(fields) <= max(self._columns):
+            self._reject(line, "missing activity or email")
+            return
+        self._accept(line, fields[activity_column].strip(), fields[email_column].strip())
+
+
+def import_file(store, file, format, allow_conflicts=False, read_size=64 * 1024):
+    """Import a binary file object into ``store`` and return the summary."""
+    roster_import = RosterImport(format)
+
+    def apply(batches):
+        for rows in batches:
+            outcomes = store.signup_many(
+                [(activity, email) for _, activity, email in rows], allow_conflicts
+            )
+            roster_import.record(rows, outcomes)
+
+    for data in iter(lambda: file.read(read_size), b""):
+        apply(roster_import.feed(data))
+    apply(roster_import.finish())
+    return roster_import.summary()
+
+
+def guess_format(filename):
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.importer",
+        description="Import enrollments into the store configured by ACTIVITIES_DB or "
+                    "ACTIVITIES_JOURNAL (stop the server first when using the journal).",
+    )
+    parser.add_argument("file", help="CSV or NDJSON file, or - for standard input")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--allow-conflicts", action="store_true",
+                        help="enroll students even when schedules clash")
+    args = parser.parse_args(argv)
+
+    format = args.format or guess_format(args.file)
+    if format is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+    db_path = os.environ.get("ACTIVITIES_DB")
+    journal_dir = os.environ.get("ACTIVITIES_JOURNAL")
+    if not db_path and not journal_dir:
+        parser.error("set ACTIVITIES_DB or ACTIVITIES_JOURNAL; "
+                     "an in-memory store would be lost on exit")
+
+    store = open_store(db_path, journal_dir, os.environ.get("ACTIVITIES_DURABILITY", "fsync"))
+    try:
+        if args.file == "-":
+            summary = import_file(store, sys.stdin.buffer, format, args.allow_conflicts)
+        else:
+            with open(args.file, "rb") as file:
+                summary = import_file(store, file, format, args.allow_conflicts)
+    except ValueError as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+    finally:
+        store.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Data structures backing the in-memory activity store.
+"""
+
+import sys
+from itertools import islice
+
+# Fields an activity can be projected to; the first four make up the
+# default representation served by GET /activities
+ACTIVITY_FIELDS = (
+    "description",
+    "schedule",
+    "max_participants",
+    "participants",
+    "participant_count",
+    "spots_left",
+)
+DEFAULT_FIELDS = ACTIVITY_FIELDS[:4]
+
+
+class Roster:
+    """Insertion-ordered set of participant emails (or activity names).
+
+    Backed by a dict, so membership checks, additions and removals are O(1)
+    while iteration still yields participants in signup order. Members are
+    interned so a student enrolled in several activities is stored once.
+    """
+
+    __slots__ = ("_members",)
+
+    def __init__(self, emails=()):
+        self._members = dict.fromkeys(map(sys.intern, emails))
+
+    def __contains__(self, email):
+        return email in self._members
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, email):
+        """Append a participant; a no-op if they are already on the roster."""
+        self._members[sys.intern(email)] = None
+
+    def remove(self, email):
+        """Remove a participant, raising KeyError if they are not on the roster."""
+        del self._members[email]
+
+    def remove_many(self, emails):
+        """Remove the listed participants that are on the roster and return them.
+
+        Removing a large share of the roster rebuilds it in one pass, which
+        also gives back the space a dict keeps after deletions; a few
+        removals are deleted in place. Either way the cost is linear.
+        """
+        removing = [email for email in dict.fromkeys(emails) if email in self._members]
+        if len(removing) * 4 >= len(self._members):
+            gone = set(removing)
+            self._members = {email: None for email in self._members if email not in gone}
+        else:
+            for email in removing:
+                del self._members[email]
+        return removing
+
+    def clear(self):
+        """Remove every participant and return them in signup order."""
+        members = list(self._members)
+        self._members = {}
+        return members
+
+    def to_list(self):
+        """Return the participants as a list in signup order."""
+        return list(self._members)
+
+    def page(self, start, limit=None):
+        """Return up to ``limit`` participants from position ``start`` on."""
+        stop = None if limit is None else start + limit
+        return list(islice(self._members, start, stop))
+
+
+class Activity:
+    """An extracurricular activity and its roster.
+
+    Uses ``__slots__`` instead of a per-activity dict to keep the memory
+    footprint small when the catalog holds thousands of activities.
+    """
+
+    __slots__ = ("name", "description", "schedule", "max_participants", "participants")
+
+    def __init__(self, name, description, schedule, max_participants, participants=()):
+        self.name = name
+        self.description = description
+        self.schedule = schedule
+        self.max_participants = max_participants
+        self.participants = Roster(participants)
+
+    @classmethod
+    def from_dict(cls, name, details):
+        """Build an activity from its JSON representation."""
+        return cls(
+            name,
+            details["description"],
+            details["schedule"],
+            details["max_participants"],
+            details["participants"],
+        )
+
+    @property
+    def spots_left(self):
+        return self.max_participants - len(self.participants)
+
+    def to_dict(self, fields=None):
+        """Return the JSON representation served by GET /activities.
+
+        ``fields`` limits the output to a subset of ``ACTIVITY_FIELDS``.
+        """
+        if fields is None:
+            return {
+                "description": self.description,
+                "schedule": self.schedule,
+                "max_participants": self.max_participants,
+                "participants": self.participants.to_list(),
+            }
+        return {field: self._field(field) for field in fields}
+
+    def _field(self, field):
+        if field == "participants":
+            return self.participants.to_list()
+        if field == "participant_count":
+            return len(self.participants)
+        return getattr(self, field)
@@ -0,0 +1,132 @@
+"""
+Parsing free-text schedules into weekly time intervals.
+
+Times are minutes from Monday 00:00, so an interval on any weekday is a
+plain ``(start, end)`` pair of integers in ``range(WEEK)``.
+"""
+
+import re
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+DAY_ALIASES = {
+    **{name: [day] for day, name in enumerate(DAY_NAMES)},
+    **{name[:3]: [day] for day, name in enumerate(DAY_NAMES)},
+    "weekday": list(range(5)),
+    "weekend": [5, 6],
+    "daily": list(range(7)),
+}
+
+TIME = r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?"
+TIME_PATTERN = re.compile(rf"^\s*{TIME}\s*$", re.IGNORECASE)
+RANGE_PATTERN = re.compile(rf"{TIME}\s*(?:-|–|to)\s*{TIME}", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+def _minutes(hour, minute, meridiem):
+    hour = int(hour)
+    minute = int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid hour: {hour}")
+        hour = hour % 12 + (12 if meridiem.lower().startswith("p") else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError(f"Invalid time: {hour}:{minute:02d}")
+    return hour * 60 + minute
+
+
+def parse_day(text):
+    """Weekday number (Monday is 0) for a name such as "Tue" or "Thursdays"."""
+    days = DAY_ALIASES.get(text.strip().lower().rstrip("s"))
+    if days is None or len(days) != 1:
+        raise ValueError(f"Unknown day: {text}")
+    return days[0]
+
+
+def parse_time(text):
+    """Minutes after midnight for a time such as "16:00", "4pm" or "3:30 PM"."""
+    match = TIME_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Invalid time: {text}")
+    return _minutes(*match.groups())
+
+
+def parse_time_range(text):
+    """``(start, end)`` minutes for a range such as "15:00-17:00" or "3 PM - 5 PM".
+
+    A range ending at or before its start runs past midnight.
+    """
+    match = RANGE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid time range: {text}")
+    groups = match.groups()
+    start_meridiem, end_meridiem = groups[2], groups[5]
+    # "3:30 - 5:00 PM" shares the trailing AM/PM
+    start = _minutes(*groups[:2], start_meridiem or end_meridiem)
+    end = _minutes(*groups[3:])
+    if start_meridiem is None and end_meridiem and start > end:
+        start = _minutes(*groups[:2], None)
+    return start, end if end > start else end + DAY
+
+
+def parse_schedule(text):
+    """Weekly ``(start, end)`` intervals for a schedule string.
+
+    Understands schedules like "Tuesdays and Thursdays, 3:30 PM - 4:30 PM"
+    or "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM". Returns an empty
+    list when no days or no time range can be found.
+    """
+    match = RANGE_PATTERN.search(text)
+    if match is None:
+        return []
+    try:
+        start, end = parse_time_range(match.group(0))
+    except ValueError:
+        return []
+
+    days = []
+    for word in WORD_PATTERN.findall(text[:match.start()].lower()):
+        for day in DAY_ALIASES.get(word.rstrip("s"), ()):
+            if day not in days:
+                days.append(day)
+    return week_windows(days, start, end)
+
+
+def occupancy_bitmaps(schedules):
+    """Map each key's intervals to a bitmap of the time segments it occupies.
+
+    The week is cut at every interval boundary in ``schedules`` (a
+    ``{key: intervals}`` dict); bit ``i`` stands for the segment between the
+    ``i``-th and next boundary. Two keys' intervals overlap exactly when
+    their bitmaps share a bit, so a conflict check is a single ``&``.
+    """
+    boundaries = sorted({
+        minute for intervals in schedules.values()
+        for interval in intervals for minute in interval
+    })
+    segment = {minute: index for index, minute in enumerate(boundaries)}
+    bitmaps = {}
+    for key, intervals in schedules.items():
+        bits = 0
+        for start, end in intervals:
+            bits |= ((1 << (segment[end] - segment[start])) - 1) << segment[start]
+        bitmaps[key] = bits
+    return bitmaps
+
+
+def week_windows(days, start=0, end=DAY):
+    """Intervals covering ``start``-``end`` minutes on each of ``days``.
+
+    An interval running past the end of Sunday is split at the week boundary.
+    """
+    windows = []
+    for day in days:
+        window_start = day * DAY + start
+        window_end = day * DAY + end
+        if window_end > WEEK:
+            windows.append((0, window_end - WEEK))
+            window_end = WEEK
+        windows.append((window_start, window_end))
+    return sorted(windows)
@@ -1,13 +1,35 @@
 // Load activities when the page loads
-document.addEventListener('DOMContentLoaded', () => {
-  loadActivities();
+document.addEventListener('DOMContentLoaded', async () => {
+  await loadActivities();
+  subscribeToChanges();
 });
 
+// Patch the affected card whenever anyone signs up or unregisters
+function subscribeToChanges() {
+  const source = new EventSource('/activities/events');
+  const onChange = (event) => refreshActivityCard(JSON.parse(event.data).activity);
+  source.addEventListener('signup', onChange);
+  source.addEventListener('unregister', onChange);
+  // We missed some changes; reload everything. The browser reconnects on its own.
+  source.addEventListener('resync', () => loadActivities());
+}
+
+// ETag of the last activities payload we rendered
+let activitiesETag = null;
+
 // Fetch and display activities
 async function loadActivities() {
   try {
-    const response = await fetch('/activities');
+    const headers = activitiesETag ? { 'If-None-Match': activitiesETag } : {};
+    const response = await fetch('/activities', { headers, cache: 'no-store' });
+
+    // Nothing changed since the last load; keep the current cards
+    if (response.status === 304) {
+      return;
+    }
+
     const activities = await response.json();
+    activitiesETag = response.headers.get('ETag');
     
     displayActivities(activities);
     populateActivitySelect(activities);
@@ -24,31 +46,51 @@ function displayActivities(activities) {
   container.innerHTML = '';
   
   for (const [name, details] of Object.entries(activities)) {
-    const card = document.createElement('div');
-    card.className = 'activity-card';
-    
-    const participantsList = details.participants.length > 0
-      ? `<ul>${details.participants.map(email => `<li>${email}<button class="delete-btn" data-activity="${name}" data-email="${email}" title="Remove participant">🗑️</button></li>`).join('')}</ul>`
-      : '<p class="no-participants">No participants yet</p>';
-    
-    card.innerHTML = `
-      <h4>${name}</h4>
-      <p><strong>Description:</strong> ${details.description}</p>
-      <p><strong>Schedule:</strong> ${details.schedule}</p>
-      <p><strong>Capacity:</strong> ${details.participants.length}/${details.max_participants}</p>
-      <div class="participants">
-        <h5>Current Participants:</h5>
-        ${participantsList}
-      </div>
-    `;
-    
-    container.appendChild(card);
+    container.appendChild(renderActivityCard(name, details));
   }
+}
+
+// Build the card for a single activity
+function renderActivityCard(name, details) {
+  const card = document.createElement('div');
+  card.className = 'activity-card';
+  card.dataset.activity = name;
+  
+  const participantsList = details.participants.length > 0
+    ? `<ul>${details.participants.map(email => `<li>${email}<button class="delete-btn" data-activity="${name}" data-email="${email}" title="Remove participant">🗑️</button></li>`).join('')}</ul>`
+    : '<p class="no-participants">No participants yet</p>';
   
-  // Add event listeners to all delete buttons
-  document.querySelectorAll('.delete-btn').forEach(btn => {
+  card.innerHTML = `
+    <h4>${name}</h4>
+    <p><strong>Description:</strong> ${details.description}</p>
+    <p><strong>Schedule:</strong> ${details.schedule}</p>
+    <p><strong>Capacity:</strong> ${details.participants.length}/${details.max_participants}</p>
+    <div class="participants">
+      <h5>Current Participants:</h5>
+      ${participantsList}
+    </div>
+  `;
+  
+  card.querySelectorAll('.delete-btn').forEach(btn => {
     btn.addEventListener('click', handleDelete);
   });
+  return card;
+}
+
+// Re-fetch one activity and replace only its card
+async function refreshActivityCard(name) {
+  const card = document.querySelector(`.activity-card[data-activity="${CSS.escape(name)}"]`);
+  if (!card) {
+    await loadActivities();
+    return;
+  }
+  
+  const response = await fetch(`/activities/${encodeURIComponent(name)}`, { cache: 'no-store' });
+  if (!response.ok) {
+    await loadActivities();
+    return;
+  }
+  card.replaceWith(renderActivityCard(name, await response.json()));
 }
 
 // Populate the activity dropdown
@@ -66,6 +108,24 @@ function populateActivitySelect(activities) {
   }
 }
 
+// Send a signup or unregister, retrying if the network drops. Every attempt
+// carries the same Idempotency-Key, so a retry of a request that did reach
+// the server gets its original response instead of being applied twice.
+async function sendWithRetry(url, method, attempts = 3) {
+  const key = crypto.randomUUID ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await fetch(url, { method, headers: { 'Idempotency-Key': key } });
+    } catch (error) {
+      if (attempt >= attempts) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500 * attempt));
+    }
+  }
+}
+
 // Handle form submission
 document.getElementById('signup-form').addEventListener('submit', async (e) => {
   e.preventDefault();
@@ -75,9 +135,7 @@ document.getElementById('signup-form').addEventListener('submit', async (e) => {
   const messageDiv = document.getElementById('message');
   
   try {
-    const response = await fetch(`/activities/${encodeURIComponent(activity)}/signup?email=${encodeURIComponent(email)}`, {
-      method: 'POST',
-    });
+    const response = await sendWithRetry(`/activities/${encodeURIComponent(activity)}/signup?email=${encodeURIComponent(email)}`, 'POST');
     
     const data = await response.json();
     
@@ -86,8 +144,8 @@ document.getElementById('signup-form').addEventListener('submit', async (e) => {
       messageDiv.textContent = data.message;
       messageDiv.classList.remove('hidden');
       
-      // Reload activities to show updated participant list
-      await loadActivities();
+      // Refresh the activity's card to show the updated participant list
+      await refreshActivityCard(activity);
       
       // Reset form
       document.getElementById('signup-form').reset();
@@ -117,15 +175,13 @@ async function handleDelete(e) {
   }
   
   try {
-    const response = await fetch(`/activities/${encodeURIComponent(activity)}/unregister?email=${encodeURIComponent(email)}`, {
-      method: 'DELETE',
-    });
+    const response = await sendWithRetry(`/activities/${encodeURIComponent(activity)}/unregister?email=${encodeURIComponent(email)}`, 'DELETE');
     
     const data = await response.json();
     
     if (response.ok) {
-      // Reload activities to show updated participant list
-      await loadActivities();
+      // Refresh the activity's card to show the updated participant list
+      await refreshActivityCard(activity);
     } else {
       throw new Error(data.detail || 'Failed to unregister');
     }
@@ -0,0 +1,57 @@
+"""
+Pluggable storage backends for the activity database.
+"""
+
+from src.storage.base import (
+    ASYNC,
+    BATCHED,
+    DURABILITY_MODES,
+    FSYNC,
+    ActivityFullError,
+    ActivityNotFoundError,
+    ActivityStore,
+    AlreadySignedUpError,
+    InvalidCursorError,
+    NotSignedUpError,
+    ScheduleConflictError,
+    SnapshotExpiredError,
+    StorageError,
+)
+from src.storage.journal import JournaledStore
+from src.storage.memory import MemoryStore
+from src.storage.sqlite import SQLiteStore
+
+
+def open_store(db_path=None, journal_dir=None, durability=FSYNC):
+    """Open the configured activity store.
+
+    ``db_path`` selects the SQLite backend, ``journal_dir`` an in-memory store
+    persisted to a write-ahead log in that directory. With neither, data lives
+    only in memory and ``durability`` is ignored.
+    """
+    if db_path:
+        return SQLiteStore(db_path, durability)
+    if journal_dir:
+        return JournaledStore(journal_dir, durability=durability)
+    return MemoryStore()
+
+
+__all__ = [
+    "ASYNC",
+    "BATCHED",
+    "DURABILITY_MODES",
+    "FSYNC",
+    "ActivityFullError",
+    "ActivityNotFoundError",
+    "ActivityStore",
+    "AlreadySignedUpError",
+    "InvalidCursorError",
+    "JournaledStore",
+    "MemoryStore",
+    "NotSignedUpError",
+    "SQLiteStore",
+    "ScheduleConflictError",
+    "SnapshotExpiredError",
+    "StorageError",
+    "open_store",
+]
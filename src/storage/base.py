@@ -0,0 +1,202 @@
+"""
+Storage interface shared by every activity store backend.
+"""
+
+import base64
+import binascii
+from abc import ABC, abstractmethod
+
+# Durability modes for persistent backends: acknowledge a write only once it
+# is on disk, once a time/size-batched group commit has flushed it, or
+# immediately while a background flush catches up
+FSYNC = "fsync"
+BATCHED = "batched"
+ASYNC = "async"
+DURABILITY_MODES = (FSYNC, BATCHED, ASYNC)
+
+
+class StorageError(Exception):
+    """Base class for errors raised by activity stores."""
+
+
+class ActivityNotFoundError(StorageError):
+    """The requested activity does not exist."""
+
+
+class AlreadySignedUpError(StorageError):
+    """The student is already on the activity's roster."""
+
+
+class ActivityFullError(StorageError):
+    """The activity has no seats left."""
+
+
+class NotSignedUpError(StorageError):
+    """The student is not on the activity's roster."""
+
+
+class ScheduleConflictError(StorageError):
+    """The activity meets at the same time as one the student is already in."""
+
+    def __init__(self, activity_name, email, conflicts):
+        super().__init__(activity_name, email, conflicts)
+        self.conflicts = conflicts
+
+
+class SnapshotExpiredError(StorageError):
+    """The catalog was reloaded while an export of it was running."""
+
+
+class InvalidCursorError(StorageError):
+    """A pagination cursor was not issued by this store."""
+
+
+def encode_cursor(position):
+    """Wrap a backend's integer resume position in an opaque cursor string."""
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Unwrap a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorError(cursor)
+    # Positions are SQLite integers in the database backend
+    if not 0 <= position < 2**63:
+        raise InvalidCursorError(cursor)
+    return position
+
+
+class ActivityStore(ABC):
+    """Backend holding activities and their rosters.
+
+    Mutations raise a ``StorageError`` subclass instead of HTTP errors so
+    every backend reports failures the same way to the API layer.
+    """
+
+    # Short name of the backend and its durability mode, reported by GET /status
+    backend = None
+    durability = None
+    # Whether calls may block on I/O; the API runs blocking stores in a
+    # thread pool and calls the others directly on the event loop
+    blocking = True
+
+    @property
+    @abstractmethod
+    def version(self):
+        """Counter that increases with every change to the store's contents.
+
+        Versions start from the creation time in microseconds, so versions
+        issued before a restart never collide with later ones.
+        """
+
+    @abstractmethod
+    def get_changes(self, since):
+        """Return the current version and the change events after ``since``.
+
+        The events are ``None`` when the store no longer holds all of them
+        (or ``since`` was not issued by this store), in which case the caller
+        should fall back to a full snapshot.
+        """
+
+    @abstractmethod
+    def load(self, data):
+        """Replace the contents of the store with ``{name: details}`` data."""
+
+    @abstractmethod
+    def seed(self, data):
+        """Load ``data`` only if the store holds no activities yet."""
+
+    @abstractmethod
+    def list_activities(self):
+        """Return every activity in the JSON shape served by GET /activities."""
+
+    @abstractmethod
+    def get_activity(self, activity_name, fields=None):
+        """Return one activity, projected onto ``fields`` if given."""
+
+    @abstractmethod
+    def get_participants(self, activity_name, cursor=None, limit=None):
+        """Return one page of an activity's roster and the next page's cursor."""
+
+    @abstractmethod
+    def query_activities(
+        self, fields=None, has_openings=False, cursor=None, limit=None, during=None
+    ):
+        """Return one page of activities and the cursor for the next page.
+
+        ``fields`` projects each activity onto a subset of ``ACTIVITY_FIELDS``,
+        ``has_openings`` keeps only activities with seats left and ``during``,
+        a list of ``(start, end)`` week-minute windows (see ``src.schedule``),
+        keeps only activities meeting in one of them. All are answered from
+        indexes, and only the requested page is materialized. The returned
+        cursor is ``None`` on the last page.
+        """
+
+    @abstractmethod
+    def search(self, query, fields=None, limit=None):
+        """Return the activities matching every term of ``query``, best first.
+
+        Each result is ``{"name": ..., "score": ...}`` plus the activity
+        projected onto ``fields``. Terms are looked up in an inverted index
+        over names, descriptions and schedules, ranked by ``search.rank``.
+        """
+
+    @abstractmethod
+    def export(self):
+        """Yield ``(name, details)`` for every activity as of one point in time.
+
+        Details are in the GET /activities shape. Activities are read one at
+        a time, so memory is bounded by the largest roster rather than the
+        whole catalog, and writes made while the generator is consumed do not
+        show up in its output. Close the generator to release it early.
+        """
+
+    @abstractmethod
+    def get_student_activities(self, email):
+        """Return the names of the activities a student is signed up for."""
+
+    @abstractmethod
+    def signup(self, activity_name, email, allow_conflicts=False):
+        """Add a student to an activity's roster.
+
+        The capacity check and the insert happen atomically, so concurrent
+        signups can never push an activity past ``max_participants``. An
+        activity meeting at the same time as one of the student's others
+        raises ``ScheduleConflictError`` unless ``allow_conflicts`` is set.
+        Returns the names of the conflicting activities (empty if none); the
+        check costs one lookup per activity the student is already in.
+        """
+
+    @abstractmethod
+    def signup_many(self, signups, allow_conflicts=False):
+        """Apply a batch of ``(activity_name, email)`` signups in one go.
+
+        Every activity involved is locked once for the whole batch (one
+        transaction for SQLite, one sync for the journal) and each item is
+        checked as ``signup`` would. Returns one result per item, in order:
+        the item's list of schedule conflicts if it was applied, or the
+        ``StorageError`` that rejected it. Rejected items do not affect the rest.
+        """
+
+    @abstractmethod
+    def unregister(self, activity_name, email):
+        """Remove a student from an activity's roster."""
+
+    @abstractmethod
+    def unregister_many(self, activity_name, emails):
+        """Remove several students from an activity's roster in one pass.
+
+        Returns one result per email, in order: ``None`` if it was removed,
+        or the ``NotSignedUpError`` for emails not on the roster (including
+        repeats of one already removed).
+        """
+
+    @abstractmethod
+    def clear_roster(self, activity_name):
+        """Remove everyone from an activity and return the emails removed."""
+
+    def close(self):
+        """Release any resources held by the store."""
@@ -0,0 +1,48 @@
+"""
+Bounded log of recent roster changes for incremental client sync.
+"""
+
+import threading
+from collections import deque
+
+
+def make_change(version, op, activity_name, email):
+    """A change event: ``op`` applied to ``email`` on ``activity_name`` at ``version``.
+
+    Events are idempotent to apply (a signup adds the email if absent, an
+    unregister removes it if present), so a client may safely replay events
+    already reflected in a snapshot it holds.
+    """
+    return {"version": version, "op": op, "activity": activity_name, "email": email}
+
+
+class ChangeLog:
+    """Ring buffer of the most recent change events, oldest first.
+
+    Every version bump except a full load produces exactly one event, so the
+    events after a given version are complete only if the buffer still holds
+    one event per version in between.
+    """
+
+    def __init__(self, size=1000):
+        self._events = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, version, op, activity_name, email):
+        with self._lock:
+            self._events.append(make_change(version, op, activity_name, email))
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def since(self, since, current):
+        """Return the events in ``(since, current]``, or ``None`` if any were dropped."""
+        if since > current:
+            return None
+        with self._lock:
+            events = list(self._events)
+        changes = [event for event in events if since < event["version"] <= current]
+        if len(changes) != current - since:
+            return None
+        return changes
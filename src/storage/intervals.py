@@ -0,0 +1,33 @@
+"""
+Static index answering which intervals overlap a query window.
+"""
+
+from bisect import bisect_left
+
+
+class IntervalIndex:
+    """Intervals sorted by start, for overlap queries in O(log n + matches).
+
+    No interval is longer than the longest one, so every interval that
+    overlaps ``[start, end)`` begins in ``(start - longest, end)``; two
+    bisections find that slice and only its members are checked. Activity
+    schedules are short and similar in length, so the slice holds little
+    besides the matches.
+    """
+
+    __slots__ = ("_starts", "_entries", "_longest")
+
+    def __init__(self, intervals=()):
+        # ``intervals`` yields (start, end, value) triples
+        self._entries = sorted(intervals, key=lambda entry: entry[0])
+        self._starts = [start for start, _, _ in self._entries]
+        self._longest = max((end - start for start, end, _ in self._entries), default=0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def overlapping(self, start, end):
+        """Values of the intervals overlapping ``[start, end)``."""
+        lo = bisect_left(self._starts, start - self._longest + 1)
+        hi = bisect_left(self._starts, end)
+        return {value for _, entry_end, value in self._entries[lo:hi] if entry_end > start}
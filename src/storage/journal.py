@@ -0,0 +1,315 @@
+"""
+In-memory activity store made durable with a write-ahead log.
+
+Every successful signup and unregister is appended to a log segment before
+the request is acknowledged. Concurrent writers share fsyncs (group commit):
+whichever writer finds no flush in progress syncs everything appended so
+far, and the others just wait for it. The durability mode can trade this
+guarantee for latency (see ``Journal``). Every ``snapshot_every`` records the
+full state is written to a compacted snapshot and the log segments it covers
+are deleted. On startup the latest snapshot is loaded and the log tail is
+replayed on top of it.
+
+Directory layout::
+
+    snapshot.json               {"lsn": N, "activities": {...}}
+    wal-000000000123.log        one JSON record per line, starting at lsn 123
+"""
+
+import json
+import os
+import threading
+
+from src.storage.base import ASYNC, BATCHED, DURABILITY_MODES, FSYNC
+from src.storage.memory import MemoryStore
+
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+
+
+class Journal:
+    """Append-only log file with group-commit fsync.
+
+    ``durability`` decides when ``sync`` returns: ``fsync`` flushes right
+    away (sharing the fsync with any concurrent writers), ``batched`` waits
+    for the background flusher, which runs every ``flush_interval`` seconds
+    or once ``batch_size`` records are pending, and ``async`` returns
+    immediately and leaves the record to the background flusher.
+    """
+
+    def __init__(self, path, lsn=0, durability=FSYNC, flush_interval=0.005, batch_size=128):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.path = path
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._file = open(path, "ab")
+        self._cond = threading.Condition()
+        self._appended = lsn
+        self._synced = lsn
+        self._syncing = False
+        self._closed = False
+        self._flusher = None
+        if durability != FSYNC:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    @property
+    def lsn(self):
+        """Sequence number of the last appended record."""
+        return self._appended
+
+    def append(self, record):
+        """Number and buffer a record; it is not durable until ``sync`` covers it."""
+        with self._cond:
+            self._appended += 1
+            record = {"lsn": self._appended, **record}
+            self._file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+            if self._appended - self._synced >= self.batch_size:
+                self._cond.notify_all()
+
+    def _flush(self):
+        """Fsync everything appended so far; the caller holds ``_cond``."""
+        self._syncing = True
+        target = self._appended
+        file = self._file
+        try:
+            file.flush()
+            # Let writers keep appending while the disk catches up
+            self._cond.release()
+            try:
+                os.fsync(file.fileno())
+            finally:
+                self._cond.acquire()
+            self._synced = max(self._synced, target)
+        finally:
+            self._syncing = False
+            self._cond.notify_all()
+
+    def _flush_loop(self):
+        with self._cond:
+            while not self._closed:
+                self._cond.wait_for(
+                    lambda: self._closed or self._appended - self._synced >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                if self._appended > self._synced and not self._syncing and not self._closed:
+                    self._flush()
+
+    def sync(self, lsn=None):
+        """Return once the record at ``lsn`` is as durable as the mode requires.
+
+        Without ``lsn``, waits for everything appended so far.
+        """
+        if self.durability == ASYNC:
+            return
+        with self._cond:
+            if lsn is None:
+                lsn = self._appended
+            while self._synced < lsn:
+                if self._syncing or self.durability == BATCHED:
+                    self._cond.wait()
+                else:
+                    self._flush()
+
+    def _wait_idle(self):
+        while self._syncing:
+            self._cond.wait()
+
+    def rotate(self, path):
+        """Sync and close the current segment and continue appending to ``path``."""
+        with self._cond:
+            self._wait_idle()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._synced = self._appended
+            self._file = open(path, "ab")
+            self.path = path
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._cond:
+            self._wait_idle()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._synced = self._appended
+            self._cond.notify_all()
+
+
+def _read_records(path):
+    """Read the records of a log segment, truncating a torn final write."""
+    records = []
+    valid_length = 0
+    with open(path, "r+b") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            valid_length += len(line)
+        file.truncate(valid_length)
+    return records
+
+
+def _fsync_directory(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournaledStore(MemoryStore):
+    """In-memory store whose mutations are logged and periodically snapshotted."""
+
+    backend = "journal"
+    blocking = True
+
+    def __init__(self, directory, snapshot_every=10_000, durability=FSYNC):
+        super().__init__()
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.durability = durability
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_lsn = 0
+
+        os.makedirs(directory, exist_ok=True)
+        lsn = self._recover()
+        self._journal = Journal(self._segment_path(lsn + 1), lsn, durability)
+
+    def _segment_path(self, start_lsn):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{start_lsn:012d}{SEGMENT_SUFFIX}")
+
+    def _segments(self):
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _recover(self):
+        """Rebuild the state from disk and return the last recovered lsn."""
+        lsn = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+            self._load(snapshot["activities"])
+            lsn = self._snapshot_lsn = snapshot["lsn"]
+
+        for path in self._segments():
+            for record in _read_records(path):
+                if record["lsn"] <= lsn:
+                    continue
+                self._apply(record)
+                lsn = record["lsn"]
+        return lsn
+
+    def _apply(self, record):
+        activity = self._get(record["activity"])
+        if record["op"] == "signup":
+            self._add(activity, record["email"])
+        elif record["op"] == "unregister":
+            self._remove(activity, record["email"])
+
+    def _changed(self, op, activity_name, email):
+        # Appending while the activity is still locked keeps each activity's
+        # records in the order they were applied; records for different
+        # activities commute, so their relative order does not matter
+        super()._changed(op, activity_name, email)
+        self._journal.append({"op": op, "activity": activity_name, "email": email})
+
+    def _commit(self):
+        self._journal.sync()
+        if self._journal.lsn - self._snapshot_lsn >= self.snapshot_every:
+            self.snapshot(blocking=False)
+
+    def _rotate(self):
+        """Capture the state and start a new segment; the caller holds every stripe."""
+        lsn = self._journal.lsn
+        state = {"lsn": lsn, "activities": self.list_activities()}
+        new_path = self._segment_path(lsn + 1)
+        old_segments = [path for path in self._segments() if path != new_path]
+        if self._journal.path != new_path:
+            self._journal.rotate(new_path)
+        return state, old_segments
+
+    def _write_snapshot(self, state, old_segments):
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, snapshot_path)
+        _fsync_directory(self.directory)
+
+        self._snapshot_lsn = state["lsn"]
+        for path in old_segments:
+            os.remove(path)
+
+    def snapshot(self, blocking=True):
+        """Write a compacted snapshot and delete the log segments it covers.
+
+        Writers are only blocked while the state is copied; the snapshot file
+        itself is written while new records go to a fresh segment.
+        """
+        if not self._snapshot_lock.acquire(blocking=blocking):
+            return
+        try:
+            with self._activity_locks.acquire_all():
+                state, old_segments = self._rotate()
+            self._write_snapshot(state, old_segments)
+        finally:
+            self._snapshot_lock.release()
+
+    def load(self, data):
+        # A load replaces everything, so it is persisted as a snapshot rather
+        # than a log record. Writers stay blocked until the snapshot is on disk
+        # so no later record can be replayed on top of the pre-load state.
+        with self._snapshot_lock, self._activity_locks.acquire_all():
+            self._load(data)
+            self._write_snapshot(*self._rotate())
+
+    def seed(self, data):
+        if not self.activities:
+            self.load(data)
+
+    def signup(self, activity_name, email, allow_conflicts=False):
+        conflicts = super().signup(activity_name, email, allow_conflicts)
+        self._commit()
+        return conflicts
+
+    def signup_many(self, signups, allow_conflicts=False):
+        # One sync covers every record of the batch
+        results = super().signup_many(signups, allow_conflicts)
+        self._commit()
+        return results
+
+    def unregister(self, activity_name, email):
+        super().unregister(activity_name, email)
+        self._commit()
+
+    def unregister_many(self, activity_name, emails):
+        results = super().unregister_many(activity_name, emails)
+        self._commit()
+        return results
+
+    def clear_roster(self, activity_name):
+        removed = super().clear_roster(activity_name)
+        self._commit()
+        return removed
+
+    def close(self):
+        self._journal.close()
@@ -0,0 +1,46 @@
+"""
+Lock striping for per-activity mutual exclusion.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class LockStripes:
+    """Fixed pool of locks shared by keys that hash to the same stripe.
+
+    Writes to different activities almost always take different locks, so
+    they do not serialize behind one global lock, while memory stays bounded
+    however many activities exist. Operations that touch several keys must
+    use ``acquire`` with all of them at once: stripes are always taken in
+    index order, which rules out lock-order deadlocks.
+    """
+
+    def __init__(self, count=64):
+        self._locks = [threading.Lock() for _ in range(count)]
+
+    def _indexes(self, keys):
+        return sorted({hash(key) % len(self._locks) for key in keys})
+
+    @contextmanager
+    def acquire(self, *keys):
+        """Hold the stripes covering every key in ``keys``."""
+        locks = [self._locks[index] for index in self._indexes(keys)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    @contextmanager
+    def acquire_all(self):
+        """Hold every stripe, excluding all writers."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
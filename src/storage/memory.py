@@ -0,0 +1,347 @@
+"""
+In-memory activity store.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from src.models import Activity, Roster
+from src.schedule import occupancy_bitmaps, parse_schedule
+from src.storage.base import (
+    ActivityFullError,
+    ActivityNotFoundError,
+    ActivityStore,
+    AlreadySignedUpError,
+    NotSignedUpError,
+    ScheduleConflictError,
+    SnapshotExpiredError,
+    StorageError,
+    decode_cursor,
+    encode_cursor,
+)
+from src.storage.changes import ChangeLog
+from src.storage.intervals import IntervalIndex
+from src.storage.locks import LockStripes
+from src.storage.search import SearchIndex
+
+
+def _contains(sorted_list, value):
+    index = bisect_left(sorted_list, value)
+    return index < len(sorted_list) and sorted_list[index] == value
+
+
+class _Export:
+    """State shared between one running export and the writers.
+
+    Writers copy an activity the export has not reached yet into ``saved``
+    before changing it, so the export still sees it as of the start.
+    """
+
+    __slots__ = ("position", "saved", "expired")
+
+    def __init__(self):
+        # Catalog position of the next activity to export
+        self.position = 0
+        self.saved = {}
+        self.expired = False
+
+
+class MemoryStore(ActivityStore):
+    """Keeps activities in a process-local dict; contents are lost on restart."""
+
+    backend = "memory"
+    blocking = False
+
+    def __init__(self, lock_stripes=64, change_log_size=1000):
+        self.activities = {}
+        # Reverse index from student email to the names of their activities
+        self.student_activities = {}
+        # Catalog order, each activity's position in it, and the sorted
+        # positions of activities with seats left, for paginated queries
+        self._order = []
+        self._positions = {}
+        self._open = []
+        self._open_lock = threading.Lock()
+        self._search = SearchIndex()
+        # Weekly meeting times of each activity, by catalog position, and
+        # the time segments each activity occupies, for conflict checks
+        self._schedule = IntervalIndex()
+        self._occupancy = {}
+        # Endpoints run in a thread pool; each roster is checked and updated
+        # under its activity's stripe so concurrent signups cannot overbook it,
+        # and the student index is guarded by stripes keyed by email. Activity
+        # stripes are always taken before student stripes.
+        self._activity_locks = LockStripes(lock_stripes)
+        self._student_locks = LockStripes(lock_stripes)
+        self._version = time.time_ns() // 1000
+        self._version_lock = threading.Lock()
+        self.changes = ChangeLog(change_log_size)
+        # Running exports; replaced rather than mutated, so writers can
+        # iterate it without a lock
+        self._exports = ()
+        self._exports_lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def _bump_version(self, op=None, activity_name=None, email=None):
+        # Writers to different activities bump concurrently; the lock keeps
+        # the counter from ever moving backwards and the change log in order
+        with self._version_lock:
+            self._version += 1
+            if op is None:
+                self.changes.clear()
+            else:
+                self.changes.append(self._version, op, activity_name, email)
+
+    def _load(self, data):
+        for export in self._exports:
+            export.expired = True
+        self.activities.clear()
+        self.student_activities.clear()
+        self._search.clear()
+        for name, details in data.items():
+            activity = self.activities[name] = Activity.from_dict(name, details)
+            self._search.add(name, activity.description, activity.schedule)
+            for email in activity.participants:
+                self.student_activities.setdefault(email, Roster()).add(name)
+        self._order = list(self.activities)
+        self._positions = {name: position for position, name in enumerate(self._order)}
+        self._open = [
+            position for position, name in enumerate(self._order)
+            if self.activities[name].spots_left > 0
+        ]
+        schedules = {name: parse_schedule(self.activities[name].schedule) for name in self._order}
+        self._schedule = IntervalIndex(
+            (start, end, self._positions[name])
+            for name, intervals in schedules.items()
+            for start, end in intervals
+        )
+        self._occupancy = occupancy_bitmaps(schedules)
+        self._bump_version()
+
+    def load(self, data):
+        with self._activity_locks.acquire_all():
+            self._load(data)
+
+    def seed(self, data):
+        if not self.activities:
+            self.load(data)
+
+    def list_activities(self):
+        return {name: activity.to_dict() for name, activity in self.activities.items()}
+
+    def get_changes(self, since):
+        # Writers bump the version and log its event under the version lock,
+        # so reading both under it never sees a version whose event is missing
+        with self._version_lock:
+            version = self._version
+            return version, self.changes.since(since, version)
+
+    def get_activity(self, activity_name, fields=None):
+        return self._get(activity_name).to_dict(fields)
+
+    def get_participants(self, activity_name, cursor=None, limit=None):
+        # Cursors are roster positions, so a page boundary can shift by the
+        # number of participants removed since the previous page
+        participants = self._get(activity_name).participants
+        start = decode_cursor(cursor) if cursor else 0
+        page = participants.page(start, limit)
+        end = start + len(page)
+        next_cursor = encode_cursor(end) if limit is not None and end < len(participants) else None
+        return page, next_cursor
+
+    def query_activities(
+        self, fields=None, has_openings=False, cursor=None, limit=None, during=None
+    ):
+        start = decode_cursor(cursor) if cursor else 0
+        with self._open_lock:
+            positions = self._open if has_openings else range(len(self._order))
+            if during is not None:
+                positions = self._meeting(during, positions if has_openings else None)
+            index = bisect_left(positions, start)
+            end = len(positions) if limit is None else min(index + limit, len(positions))
+            page = positions[index:end]
+            has_more = end < len(positions)
+
+        names = [self._order[position] for position in page]
+        result = {name: self.activities[name].to_dict(fields) for name in names}
+        next_cursor = encode_cursor(page[-1] + 1) if has_more and page else None
+        return result, next_cursor
+
+    def search(self, query, fields=None, limit=None):
+        return [
+            {"name": name, "score": round(score, 4), **self.activities[name].to_dict(fields)}
+            for name, score in self._search.search(query, limit)
+        ]
+
+    def _meeting(self, during, within=None):
+        """Sorted positions of activities meeting in any window, optionally within a sorted list."""
+        matches = set()
+        for window_start, window_end in during:
+            matches |= self._schedule.overlapping(window_start, window_end)
+        if within is not None:
+            matches = [position for position in matches if _contains(within, position)]
+        return sorted(matches)
+
+    def export(self):
+        # Writers are stopped only while the export registers; after that
+        # each activity is read under its own stripe, and writers save a copy
+        # of any activity the export has yet to reach before changing it
+        # (see _save_for_exports). Memory grows only with the activities
+        # changed while the export runs, each copied once.
+        export = _Export()
+        with self._activity_locks.acquire_all(), self._exports_lock:
+            self._exports += (export,)
+            order = self._order
+        try:
+            for position, name in enumerate(order):
+                with self._activity_locks.acquire(name):
+                    if export.expired:
+                        raise SnapshotExpiredError(name)
+                    details = export.saved.pop(name, None) or self.activities[name].to_dict()
+                    export.position = position + 1
+                yield name, details
+        finally:
+            with self._exports_lock:
+                self._exports = tuple(other for other in self._exports if other is not export)
+
+    def _save_for_exports(self, activity):
+        """Copy an activity for running exports yet to reach it; the caller holds its stripe."""
+        for export in self._exports:
+            if (
+                self._positions[activity.name] >= export.position
+                and activity.name not in export.saved
+            ):
+                export.saved[activity.name] = activity.to_dict()
+
+    def get_student_activities(self, email):
+        enrolled = self.student_activities.get(email)
+        return enrolled.to_list() if enrolled else []
+
+    def _get(self, activity_name):
+        activity = self.activities.get(activity_name)
+        if activity is None:
+            raise ActivityNotFoundError(activity_name)
+        return activity
+
+    def _conflicts(self, activity_name, enrolled):
+        """Names of the enrolled activities meeting at the same time as this one."""
+        occupied = self._occupancy.get(activity_name, 0)
+        if not occupied:
+            return []
+        return [name for name in enrolled if self._occupancy.get(name, 0) & occupied]
+
+    def _add(self, activity, email, allow_conflicts=True):
+        """Add a participant and return any schedule conflicts; the caller holds the activity's stripe."""
+        if email in activity.participants:
+            raise AlreadySignedUpError(activity.name, email)
+        if len(activity.participants) >= activity.max_participants:
+            raise ActivityFullError(activity.name)
+        self._save_for_exports(activity)
+
+        # Checked under the student's stripe so two concurrent signups for
+        # clashing activities cannot both pass
+        with self._student_locks.acquire(email):
+            enrolled = self.student_activities.get(email)
+            conflicts = self._conflicts(activity.name, enrolled) if enrolled else []
+            if conflicts and not allow_conflicts:
+                raise ScheduleConflictError(activity.name, email, conflicts)
+
+            activity.participants.add(email)
+            if activity.spots_left == 0:
+                with self._open_lock:
+                    del self._open[bisect_left(self._open, self._positions[activity.name])]
+            self.student_activities.setdefault(email, Roster()).add(activity.name)
+        return conflicts
+
+    def _remove(self, activity, email):
+        """Remove a participant; the caller holds the activity's stripe."""
+        if email not in activity.participants:
+            raise NotSignedUpError(activity.name, email)
+
+        self._save_for_exports(activity)
+        activity.participants.remove(email)
+        if activity.spots_left == 1:
+            with self._open_lock:
+                insort(self._open, self._positions[activity.name])
+        with self._student_locks.acquire(email):
+            enrolled = self.student_activities[email]
+            enrolled.remove(activity.name)
+            if not enrolled:
+                del self.student_activities[email]
+
+    def _remove_many(self, activity, emails):
+        """Remove participants in one pass and return them; the caller holds the activity's stripe."""
+        # Activities may be loaded with more participants than seats, so
+        # reopen whenever the removals take the activity from full to open
+        before = activity.spots_left
+        self._save_for_exports(activity)
+        removed = activity.participants.remove_many(emails)
+        if before <= 0 < activity.spots_left:
+            with self._open_lock:
+                insort(self._open, self._positions[activity.name])
+        for email in removed:
+            with self._student_locks.acquire(email):
+                enrolled = self.student_activities[email]
+                enrolled.remove(activity.name)
+                if not enrolled:
+                    del self.student_activities[email]
+        return removed
+
+    def _changed(self, op, activity_name, email):
+        """Hook run after a mutation is applied, while the activity is still locked."""
+        self._bump_version(op, activity_name, email)
+
+    def signup(self, activity_name, email, allow_conflicts=False):
+        activity = self._get(activity_name)
+        with self._activity_locks.acquire(activity_name):
+            conflicts = self._add(activity, email, allow_conflicts)
+            self._changed("signup", activity_name, email)
+        return conflicts
+
+    def signup_many(self, signups, allow_conflicts=False):
+        results = []
+        with self._activity_locks.acquire(*{name for name, _ in signups}):
+            for activity_name, email in signups:
+                try:
+                    conflicts = self._add(self._get(activity_name), email, allow_conflicts)
+                except StorageError as error:
+                    results.append(error)
+                    continue
+                self._changed("signup", activity_name, email)
+                results.append(conflicts)
+        return results
+
+    def unregister(self, activity_name, email):
+        activity = self._get(activity_name)
+        with self._activity_locks.acquire(activity_name):
+            self._remove(activity, email)
+            self._changed("unregister", activity_name, email)
+
+    def unregister_many(self, activity_name, emails):
+        activity = self._get(activity_name)
+        with self._activity_locks.acquire(activity_name):
+            removed = self._remove_many(activity, emails)
+            for email in removed:
+                self._changed("unregister", activity_name, email)
+
+        pending = set(removed)
+        results = []
+        for email in emails:
+            if email in pending:
+                pending.discard(email)
+                results.append(None)
+            else:
+                results.append(NotSignedUpError(activity_name, email))
+        return results
+
+    def clear_roster(self, activity_name):
+        activity = self._get(activity_name)
+        with self._activity_locks.acquire(activity_name):
+            removed = self._remove_many(activity, activity.participants.to_list())
+            for email in removed:
+                self._changed("unregister", activity_name, email)
+        return removed
@@ -0,0 +1,115 @@
+"""
+Tokenizing, indexing and ranking for activity search.
+
+Every backend ranks with the same function so results do not depend on the
+store in use: an activity must contain every query term, and scores sum each
+term's weight in the activity (name matches count triple) times its inverse
+document frequency. Ties are broken by name.
+"""
+
+import math
+import re
+
+WORD = re.compile(r"[a-z0-9]+")
+NAME_WEIGHT = 3.0
+
+
+def normalize(token):
+    # Fold simple plurals so "monday" finds "Mondays" and "club" finds "Clubs"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Split text into normalized lowercase terms."""
+    return [normalize(word) for word in WORD.findall(text.lower())]
+
+
+def query_terms(query):
+    """The distinct terms of a search query, in order."""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def term_weights(name, description, schedule):
+    """Map each term of an activity to its weight in that activity."""
+    weights = {}
+    for text, weight in ((name, NAME_WEIGHT), (description, 1.0), (schedule, 1.0)):
+        for term in tokenize(text):
+            weights[term] = weights.get(term, 0.0) + weight
+    return weights
+
+
+def rank(postings, document_count, limit=None):
+    """Rank the documents matching every term; returns (name, score) pairs.
+
+    ``postings`` holds one ``{name: weight}`` dict per query term. Candidates
+    come from the shortest one, so the cost follows the rarest term.
+    """
+    if not postings or not all(postings):
+        return []
+    idfs = [math.log(1 + document_count / len(posting)) for posting in postings]
+    terms = sorted(zip(postings, idfs), key=lambda term: len(term[0]))
+    (shortest, shortest_idf), rest = terms[0], terms[1:]
+
+    candidates = shortest.keys()
+    for posting, _ in rest:
+        candidates = candidates & posting.keys()
+    scores = {name: shortest[name] * shortest_idf for name in candidates}
+    for posting, idf in rest:
+        for name in scores:
+            scores[name] += posting[name] * idf
+
+    # The second sort is stable, so equal scores stay in name order
+    ranked = sorted(scores)
+    ranked.sort(key=scores.__getitem__, reverse=True)
+    return [(name, scores[name]) for name in ranked[:limit]]
+
+
+class SearchIndex:
+    """In-memory inverted index from terms to activity names."""
+
+    def __init__(self):
+        self._postings = {}
+        self._terms = {}
+        # Single-term results for indexed terms, ranked on first use and
+        # dropped on any change; bounded by the index's own vocabulary
+        self._ranked = {}
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, name, description, schedule):
+        self.remove(name)
+        weights = term_weights(name, description, schedule)
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[name] = weight
+        # Every score depends on the document count
+        self._ranked.clear()
+        self._terms[name] = tuple(weights)
+
+    def remove(self, name):
+        for term in self._terms.pop(name, ()):
+            posting = self._postings[term]
+            del posting[name]
+            if not posting:
+                del self._postings[term]
+        self._ranked.clear()
+
+    def clear(self):
+        self._postings.clear()
+        self._terms.clear()
+        self._ranked.clear()
+
+    def search(self, query, limit=None):
+        terms = query_terms(query)
+        postings = [self._postings.get(term, {}) for term in terms]
+        if len(terms) != 1:
+            return rank(postings, len(self._terms), limit)
+        if terms[0] not in self._postings:
+            return []
+        # One term ranks by weight alone, so its order is reused until the index changes
+        ranked = self._ranked.get(terms[0])
+        if ranked is None:
+            ranked = self._ranked[terms[0]] = rank(postings, len(self._terms))
+        return ranked[:limit]
@@ -0,0 +1,552 @@
+"""
+SQLite activity store.
+
+The database runs in WAL mode so several uvicorn workers can share one file:
+readers never block the single writer, and every signup is durable once its
+transaction commits. Each thread gets its own connection, and statements use
+fixed SQL text so the sqlite3 statement cache reuses the prepared statements.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src.models import DEFAULT_FIELDS
+from src.schedule import parse_schedule
+from src.storage.changes import make_change
+from src.storage.search import query_terms, rank, term_weights
+from src.storage.base import (
+    ASYNC,
+    BATCHED,
+    DURABILITY_MODES,
+    FSYNC,
+    ActivityFullError,
+    ActivityNotFoundError,
+    ActivityStore,
+    AlreadySignedUpError,
+    NotSignedUpError,
+    ScheduleConflictError,
+    StorageError,
+    decode_cursor,
+    encode_cursor,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    max_participants INTEGER NOT NULL,
+    participant_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS participants (
+    id INTEGER PRIMARY KEY,
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    UNIQUE (activity_id, email)
+);
+CREATE INDEX IF NOT EXISTS participants_email ON participants (email);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_terms (
+    term TEXT NOT NULL,
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    weight REAL NOT NULL,
+    PRIMARY KEY (term, activity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS search_terms_activity ON search_terms (activity_id);
+CREATE TABLE IF NOT EXISTS schedule_slots (
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    start_minute INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedule_slots_start ON schedule_slots (start_minute);
+CREATE INDEX IF NOT EXISTS schedule_slots_length ON schedule_slots (end_minute - start_minute);
+CREATE INDEX IF NOT EXISTS schedule_slots_activity ON schedule_slots (activity_id);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY,
+    op TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+"""
+
+# Created after migrations, since they depend on columns older files lack
+INDEXES = """
+CREATE INDEX IF NOT EXISTS activities_openings ON activities (id)
+    WHERE participant_count < max_participants;
+"""
+
+SELECT_ACTIVITY_ID = "SELECT id FROM activities WHERE name = ?"
+SELECT_CAPACITY = (
+    "SELECT id, max_participants, participant_count FROM activities WHERE name = ?"
+)
+SELECT_PARTICIPANT = "SELECT 1 FROM participants WHERE activity_id = ? AND email = ?"
+SELECT_ACTIVITIES = (
+    "SELECT id, name, description, schedule, max_participants FROM activities ORDER BY id"
+)
+SELECT_PARTICIPANTS = "SELECT activity_id, email FROM participants ORDER BY id"
+SELECT_ACTIVITY = (
+    "SELECT id, name, description, schedule, max_participants, participant_count "
+    "FROM activities WHERE name = ?"
+)
+SELECT_ROSTER = "SELECT email FROM participants WHERE activity_id = ? ORDER BY id"
+SELECT_ROSTER_PAGE = (
+    "SELECT id, email FROM participants WHERE activity_id = ? AND id >= ? ORDER BY id LIMIT ?"
+)
+SELECT_PAGE = (
+    "SELECT id, name, description, schedule, max_participants, participant_count "
+    "FROM activities WHERE id >= ? ORDER BY id LIMIT ?"
+)
+SELECT_OPEN_PAGE = (
+    "SELECT id, name, description, schedule, max_participants, participant_count "
+    "FROM activities WHERE id >= ? AND participant_count < max_participants "
+    "ORDER BY id LIMIT ?"
+)
+SELECT_PAGE_PARTICIPANTS = (
+    "SELECT activity_id, email FROM participants "
+    "WHERE activity_id BETWEEN ? AND ? ORDER BY id"
+)
+SELECT_STUDENT_ACTIVITIES = (
+    "SELECT a.name FROM participants p JOIN activities a ON a.id = p.activity_id "
+    "WHERE p.email = ? ORDER BY p.id"
+)
+INSERT_ACTIVITY = (
+    "INSERT INTO activities (name, description, schedule, max_participants) "
+    "VALUES (?, ?, ?, ?)"
+)
+SELECT_POSTING = (
+    "SELECT a.name, t.weight FROM search_terms t JOIN activities a ON a.id = t.activity_id "
+    "WHERE t.term = ?"
+)
+SELECT_UNINDEXED = (
+    "SELECT id, name, description, schedule FROM activities "
+    "WHERE NOT EXISTS (SELECT 1 FROM search_terms WHERE activity_id = activities.id)"
+)
+COUNT_ACTIVITIES = "SELECT COUNT(*) FROM activities"
+INSERT_TERM = "INSERT INTO search_terms (term, activity_id, weight) VALUES (?, ?, ?)"
+SELECT_LONGEST_SLOT = "SELECT MAX(end_minute - start_minute) FROM schedule_slots"
+# Every overlapping slot starts within the longest slot's length of the window
+SELECT_MEETING = (
+    "SELECT activity_id FROM schedule_slots "
+    "WHERE start_minute > ? AND start_minute < ? AND end_minute > ?"
+)
+SELECT_ACTIVITY_BY_ID = (
+    "SELECT id, name, description, schedule, max_participants, participant_count "
+    "FROM activities WHERE id = ?"
+)
+SELECT_UNSCHEDULED = (
+    "SELECT id, schedule FROM activities "
+    "WHERE NOT EXISTS (SELECT 1 FROM schedule_slots WHERE activity_id = activities.id)"
+)
+INSERT_SLOT = "INSERT INTO schedule_slots (activity_id, start_minute, end_minute) VALUES (?, ?, ?)"
+# The student's activities with a slot overlapping any slot of the new one;
+# one index lookup per activity the student is in
+SELECT_CONFLICTS = (
+    "SELECT DISTINCT a.name FROM participants p "
+    "JOIN activities a ON a.id = p.activity_id "
+    "JOIN schedule_slots mine ON mine.activity_id = p.activity_id "
+    "JOIN schedule_slots new ON new.activity_id = ? "
+    "AND mine.start_minute < new.end_minute AND mine.end_minute > new.start_minute "
+    "WHERE p.email = ? ORDER BY p.id"
+)
+INSERT_PARTICIPANT = "INSERT OR IGNORE INTO participants (activity_id, email) VALUES (?, ?)"
+DELETE_PARTICIPANT = "DELETE FROM participants WHERE activity_id = ? AND email = ?"
+DELETE_ROSTER = "DELETE FROM participants WHERE activity_id = ?"
+ADJUST_COUNT = "UPDATE activities SET participant_count = participant_count + ? WHERE id = ?"
+RECOUNT_PARTICIPANTS = (
+    "UPDATE activities SET participant_count = "
+    "(SELECT COUNT(*) FROM participants WHERE activity_id = activities.id)"
+)
+INIT_VERSION = "INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)"
+SELECT_VERSION = "SELECT value FROM meta WHERE key = 'version'"
+BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+INSERT_CHANGE = (
+    "INSERT INTO changes (version, op, activity, email) "
+    "SELECT value, ?, ?, ? FROM meta WHERE key = 'version'"
+)
+TRIM_CHANGES = (
+    "DELETE FROM changes "
+    "WHERE version <= (SELECT value FROM meta WHERE key = 'version') - ?"
+)
+SELECT_OLDEST_CHANGE = "SELECT MIN(version) FROM changes"
+SELECT_CHANGES = (
+    "SELECT version, op, activity, email FROM changes WHERE version > ? ORDER BY version"
+)
+
+# In WAL mode, FULL syncs the log on every commit, NORMAL only at checkpoints
+# (commits are batched onto disk), and OFF leaves flushing to the OS
+SYNCHRONOUS = {FSYNC: "FULL", BATCHED: "NORMAL", ASYNC: "OFF"}
+
+
+def _project(row, participants, fields):
+    """Build an activity's JSON representation from an activities row."""
+    _, _, description, schedule, max_participants, count = row
+    values = {
+        "description": description,
+        "schedule": schedule,
+        "max_participants": max_participants,
+        "participants": participants,
+        "participant_count": count,
+        "spots_left": max_participants - count,
+    }
+    return {field: values[field] for field in (DEFAULT_FIELDS if fields is None else fields)}
+
+
+class SQLiteStore(ActivityStore):
+    """Stores activities in a SQLite database file shared between workers."""
+
+    backend = "sqlite"
+
+    def __init__(self, path, durability=FSYNC, change_log_size=1000):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.path = path
+        self.durability = durability
+        self.change_log_size = change_log_size
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        conn.execute(INIT_VERSION, (time.time_ns() // 1000,))
+        self._migrate()
+        conn.executescript(INDEXES)
+
+    def _migrate(self):
+        """Bring databases created by earlier versions up to the current schema."""
+        with self._transaction("IMMEDIATE") as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(activities)")}
+            if "participant_count" not in columns:
+                conn.execute(
+                    "ALTER TABLE activities "
+                    "ADD COLUMN participant_count INTEGER NOT NULL DEFAULT 0"
+                )
+                conn.execute(RECOUNT_PARTICIPANTS)
+            for row in conn.execute(SELECT_UNINDEXED).fetchall():
+                self._index_terms(conn, *row)
+            for row in conn.execute(SELECT_UNSCHEDULED).fetchall():
+                self._index_schedule(conn, *row)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS[self.durability]}")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @property
+    def version(self):
+        # Shared by every worker, since it lives in the database
+        return self._connection().execute(SELECT_VERSION).fetchone()[0]
+
+    @contextmanager
+    def _transaction(self, mode="DEFERRED"):
+        conn = self._connection()
+        conn.execute(f"BEGIN {mode}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _activity_id(self, conn, activity_name):
+        row = conn.execute(SELECT_ACTIVITY_ID, (activity_name,)).fetchone()
+        if row is None:
+            raise ActivityNotFoundError(activity_name)
+        return row[0]
+
+    def _index_terms(self, conn, activity_id, name, description, schedule):
+        weights = term_weights(name, description, schedule)
+        conn.executemany(
+            INSERT_TERM, ((term, activity_id, weight) for term, weight in weights.items())
+        )
+
+    def _index_schedule(self, conn, activity_id, schedule):
+        conn.executemany(
+            INSERT_SLOT, ((activity_id, start, end) for start, end in parse_schedule(schedule))
+        )
+
+    def _insert(self, conn, data):
+        for name, details in data.items():
+            cursor = conn.execute(
+                INSERT_ACTIVITY,
+                (name, details["description"], details["schedule"], details["max_participants"]),
+            )
+            self._index_terms(
+                conn, cursor.lastrowid, name, details["description"], details["schedule"]
+            )
+            self._index_schedule(conn, cursor.lastrowid, details["schedule"])
+            conn.executemany(
+                INSERT_PARTICIPANT,
+                ((cursor.lastrowid, email) for email in details["participants"]),
+            )
+        conn.execute(RECOUNT_PARTICIPANTS)
+
+    def load(self, data):
+        with self._transaction("IMMEDIATE") as conn:
+            conn.execute("DELETE FROM participants")
+            conn.execute("DELETE FROM search_terms")
+            conn.execute("DELETE FROM schedule_slots")
+            conn.execute("DELETE FROM activities")
+            conn.execute("DELETE FROM changes")
+            self._insert(conn, data)
+            conn.execute(BUMP_VERSION)
+
+    def seed(self, data):
+        # IMMEDIATE takes the write lock up front, so concurrently starting
+        # workers cannot both see an empty database and seed it twice
+        with self._transaction("IMMEDIATE") as conn:
+            if conn.execute("SELECT 1 FROM activities LIMIT 1").fetchone() is None:
+                self._insert(conn, data)
+                conn.execute(BUMP_VERSION)
+
+    def list_activities(self):
+        # Both queries run in one read transaction so they see the same snapshot
+        with self._transaction() as conn:
+            rows = conn.execute(SELECT_ACTIVITIES).fetchall()
+            participants = conn.execute(SELECT_PARTICIPANTS).fetchall()
+
+        by_id = {}
+        result = {}
+        for activity_id, name, description, schedule, max_participants in rows:
+            result[name] = by_id[activity_id] = {
+                "description": description,
+                "schedule": schedule,
+                "max_participants": max_participants,
+                "participants": [],
+            }
+        for activity_id, email in participants:
+            by_id[activity_id]["participants"].append(email)
+        return result
+
+    def _record_change(self, conn, op, activity_name, email):
+        """Bump the version and log the change, inside the write transaction."""
+        conn.execute(BUMP_VERSION)
+        conn.execute(INSERT_CHANGE, (op, activity_name, email))
+        conn.execute(TRIM_CHANGES, (self.change_log_size,))
+
+    def get_changes(self, since):
+        with self._transaction() as conn:
+            version = conn.execute(SELECT_VERSION).fetchone()[0]
+            if since >= version:
+                return version, [] if since == version else None
+            oldest = conn.execute(SELECT_OLDEST_CHANGE).fetchone()[0]
+            if oldest is None or oldest > since + 1:
+                return version, None
+            rows = conn.execute(SELECT_CHANGES, (since,)).fetchall()
+        changes = [make_change(*row) for row in rows]
+        return version, changes if len(changes) == version - since else None
+
+    def get_activity(self, activity_name, fields=None):
+        with self._transaction() as conn:
+            row = conn.execute(SELECT_ACTIVITY, (activity_name,)).fetchone()
+            if row is None:
+                raise ActivityNotFoundError(activity_name)
+            participants = []
+            if fields is None or "participants" in fields:
+                participants = [email for email, in conn.execute(SELECT_ROSTER, (row[0],))]
+        return _project(row, participants, fields)
+
+    def get_participants(self, activity_name, cursor=None, limit=None):
+        start = decode_cursor(cursor) if cursor else 0
+        fetch = -1 if limit is None else limit + 1
+        with self._transaction() as conn:
+            activity_id = self._activity_id(conn, activity_name)
+            rows = conn.execute(SELECT_ROSTER_PAGE, (activity_id, start, fetch)).fetchall()
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0] + 1) if has_more else None
+        return [email for _, email in rows], next_cursor
+
+    def query_activities(
+        self, fields=None, has_openings=False, cursor=None, limit=None, during=None
+    ):
+        start = decode_cursor(cursor) if cursor else 0
+        if during is not None:
+            return self._query_meeting(fields, has_openings, start, limit, during)
+        query = SELECT_OPEN_PAGE if has_openings else SELECT_PAGE
+        # Fetch one extra row to learn whether another page follows
+        fetch = -1 if limit is None else limit + 1
+        want_participants = fields is None or "participants" in fields
+
+        with self._transaction() as conn:
+            rows = conn.execute(query, (start, fetch)).fetchall()
+            has_more = limit is not None and len(rows) > limit
+            rows = rows[:limit]
+            participants = []
+            if rows and want_participants:
+                participants = conn.execute(
+                    SELECT_PAGE_PARTICIPANTS, (rows[0][0], rows[-1][0])
+                ).fetchall()
+
+        rosters = {row[0]: [] for row in rows}
+        for activity_id, email in participants:
+            if activity_id in rosters:
+                rosters[activity_id].append(email)
+
+        result = {row[1]: _project(row, rosters[row[0]], fields) for row in rows}
+
+        next_cursor = encode_cursor(rows[-1][0] + 1) if has_more else None
+        return result, next_cursor
+
+    def search(self, query, fields=None, limit=None):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        want_participants = fields is None or "participants" in fields
+        with self._transaction() as conn:
+            document_count = conn.execute(COUNT_ACTIVITIES).fetchone()[0]
+            postings = [dict(conn.execute(SELECT_POSTING, (term,)).fetchall()) for term in terms]
+            results = []
+            for name, score in rank(postings, document_count, limit):
+                row = conn.execute(SELECT_ACTIVITY, (name,)).fetchone()
+                participants = []
+                if want_participants:
+                    participants = [email for email, in conn.execute(SELECT_ROSTER, (row[0],))]
+                results.append(
+                    {"name": name, "score": round(score, 4), **_project(row, participants, fields)}
+                )
+        return results
+
+    def _query_meeting(self, fields, has_openings, start, limit, during):
+        """query_activities restricted to activities meeting in one of the windows."""
+        want_participants = fields is None or "participants" in fields
+        with self._transaction() as conn:
+            longest = conn.execute(SELECT_LONGEST_SLOT).fetchone()[0] or 0
+            matches = set()
+            for window_start, window_end in during:
+                rows = conn.execute(
+                    SELECT_MEETING, (window_start - longest, window_end, window_start)
+                )
+                matches.update(activity_id for activity_id, in rows)
+
+            result = {}
+            next_cursor = None
+            for activity_id in sorted(matches):
+                if activity_id < start:
+                    continue
+                row = conn.execute(SELECT_ACTIVITY_BY_ID, (activity_id,)).fetchone()
+                if has_openings and row[5] >= row[4]:
+                    continue
+                if limit is not None and len(result) == limit:
+                    next_cursor = encode_cursor(activity_id)
+                    break
+                participants = []
+                if want_participants:
+                    participants = [email for email, in conn.execute(SELECT_ROSTER, (activity_id,))]
+                result[row[1]] = _project(row, participants, fields)
+        return result, next_cursor
+
+    def export(self):
+        # A connection of its own holds one read transaction open for the
+        # whole export; in WAL mode writers keep committing meanwhile and the
+        # transaction keeps seeing the database as of its first read.
+        # Checkpoints cannot pass that point until the export finishes.
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        try:
+            conn.execute("BEGIN")
+            for activity_id, name, description, schedule, max_participants in conn.execute(
+                SELECT_ACTIVITIES
+            ):
+                yield name, {
+                    "description": description,
+                    "schedule": schedule,
+                    "max_participants": max_participants,
+                    "participants": [
+                        email for email, in conn.execute(SELECT_ROSTER, (activity_id,))
+                    ],
+                }
+        finally:
+            conn.close()
+
+    def get_student_activities(self, email):
+        rows = self._connection().execute(SELECT_STUDENT_ACTIVITIES, (email,))
+        return [name for name, in rows]
+
+    def _signup(self, conn, activity_name, email, allow_conflicts):
+        """Check and apply one signup inside a write transaction; nothing is written if it fails."""
+        row = conn.execute(SELECT_CAPACITY, (activity_name,)).fetchone()
+        if row is None:
+            raise ActivityNotFoundError(activity_name)
+        activity_id, max_participants, participant_count = row
+        if conn.execute(SELECT_PARTICIPANT, (activity_id, email)).fetchone():
+            raise AlreadySignedUpError(activity_name, email)
+        if participant_count >= max_participants:
+            raise ActivityFullError(activity_name)
+        conflicts = [name for name, in conn.execute(SELECT_CONFLICTS, (activity_id, email))]
+        if conflicts and not allow_conflicts:
+            raise ScheduleConflictError(activity_name, email, conflicts)
+        conn.execute(INSERT_PARTICIPANT, (activity_id, email))
+        conn.execute(ADJUST_COUNT, (1, activity_id))
+        self._record_change(conn, "signup", activity_name, email)
+        return conflicts
+
+    def signup(self, activity_name, email, allow_conflicts=False):
+        # The IMMEDIATE transaction holds the database write lock, so the seat
+        # count and the student's schedule cannot change between the checks
+        # and the insert in any worker
+        with self._transaction("IMMEDIATE") as conn:
+            return self._signup(conn, activity_name, email, allow_conflicts)
+
+    def signup_many(self, signups, allow_conflicts=False):
+        results = []
+        with self._transaction("IMMEDIATE") as conn:
+            for activity_name, email in signups:
+                try:
+                    results.append(self._signup(conn, activity_name, email, allow_conflicts))
+                except StorageError as error:
+                    results.append(error)
+        return results
+
+    def unregister(self, activity_name, email):
+        with self._transaction("IMMEDIATE") as conn:
+            activity_id = self._activity_id(conn, activity_name)
+            if conn.execute(DELETE_PARTICIPANT, (activity_id, email)).rowcount == 0:
+                raise NotSignedUpError(activity_name, email)
+            conn.execute(ADJUST_COUNT, (-1, activity_id))
+            self._record_change(conn, "unregister", activity_name, email)
+
+    def unregister_many(self, activity_name, emails):
+        results = []
+        with self._transaction("IMMEDIATE") as conn:
+            activity_id = self._activity_id(conn, activity_name)
+            for email in emails:
+                if conn.execute(DELETE_PARTICIPANT, (activity_id, email)).rowcount == 0:
+                    results.append(NotSignedUpError(activity_name, email))
+                    continue
+                self._record_change(conn, "unregister", activity_name, email)
+                results.append(None)
+            removed = results.count(None)
+            if removed:
+                conn.execute(ADJUST_COUNT, (-removed, activity_id))
+        return results
+
+    def clear_roster(self, activity_name):
+        with self._transaction("IMMEDIATE") as conn:
+            activity_id = self._activity_id(conn, activity_name)
+            removed = [email for email, in conn.execute(SELECT_ROSTER, (activity_id,))]
+            conn.execute(DELETE_ROSTER, (activity_id,))
+            conn.execute(ADJUST_COUNT, (-len(removed), activity_id))
+            for email in removed:
+                self._record_change(conn, "unregister", activity_name, email)
+        return removed
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -4,7 +4,7 @@ Pytest configuration and fixtures for testing the FastAPI application.
 
 import pytest
 from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import app, load_activities
 
 
 @pytest.fixture
@@ -75,11 +75,9 @@ def reset_activities():
     }
     
     # Reset activities to original state
-    activities.clear()
-    activities.update(original_activities)
+    load_activities(original_activities)
     
     yield
     
     # Clean up after test
-    activities.clear()
-    activities.update(original_activities)
+    load_activities(original_activities)
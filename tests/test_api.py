@@ -5,6 +5,10 @@ Tests for the Mergington High School Activities API.
 import pytest
 from fastapi import status
 
+import src.app
+from src.cache import ResponseCache
+from src.storage import SQLiteStore
+
 
 class TestRootEndpoint:
     """Tests for the root endpoint."""
@@ -16,6 +20,42 @@ class TestRootEndpoint:
         assert response.headers["location"] == "/static/index.html"
 
 
+class TestStatusEndpoint:
+    """Tests for the GET /status endpoint."""
+
+    def test_reports_backend_and_durability(self, client):
+        """Test that the default in-memory store reports no durability mode."""
+        response = client.get("/status")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"backend": "memory", "durability": None}
+
+
+class TestBlockingStore:
+    """Tests that endpoints work when the store runs in the thread pool."""
+
+    @pytest.fixture
+    def sqlite_store(self, monkeypatch, tmp_path):
+        """Swap the app's store for a blocking SQLite store."""
+        sqlite_store = SQLiteStore(str(tmp_path / "activities.db"))
+        sqlite_store.load(src.app.INITIAL_ACTIVITIES)
+        monkeypatch.setattr(src.app, "store", sqlite_store)
+        monkeypatch.setattr(src.app, "response_cache", ResponseCache())
+        yield sqlite_store
+        sqlite_store.close()
+
+    def test_signup_and_unregister_through_thread_pool(self, client, sqlite_store):
+        """Test the signup lifecycle against a blocking backend."""
+        assert sqlite_store.blocking
+        email = "pooled@mergington.edu"
+        response = client.post(f"/activities/Chess Club/signup?email={email}")
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(f"/students/{email}/activities").json() == ["Chess Club"]
+
+        response = client.delete(f"/activities/Chess Club/unregister?email={email}")
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get("/status").json()["backend"] == "sqlite"
+
+
 class TestGetActivities:
     """Tests for the GET /activities endpoint."""
     
@@ -43,6 +83,40 @@ class TestGetActivities:
             assert "participants" in activity
             assert isinstance(activity["participants"], list)
     
+    def test_cached_response_follows_mutations(self, client):
+        """Test that a cached catalog is rebuilt after every signup."""
+        first = client.get("/activities")
+        assert client.get("/activities").content == first.content
+
+        client.post("/activities/Chess Club/signup?email=cached@mergington.edu")
+        data = client.get("/activities").json()
+        assert "cached@mergington.edu" in data["Chess Club"]["participants"]
+
+    def test_returns_strong_etag(self, client):
+        """Test that the catalog carries a strong ETag."""
+        response = client.get("/activities")
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('"')
+        assert client.get("/activities").headers["etag"] == etag
+
+    def test_matching_etag_returns_304(self, client):
+        """Test that a conditional GET with the current ETag has no body."""
+        etag = client.get("/activities").headers["etag"]
+        response = client.get("/activities", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_stale_etag_returns_full_body(self, client):
+        """Test that a signup invalidates the previous ETag."""
+        etag = client.get("/activities").headers["etag"]
+        client.post("/activities/Chess Club/signup?email=etag@mergington.edu")
+
+        response = client.get("/activities", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert "etag@mergington.edu" in response.json()["Chess Club"]["participants"]
+
     def test_activities_have_correct_initial_participants(self, client):
         """Test that activities have the correct initial participants."""
         response = client.get("/activities")
@@ -53,8 +127,292 @@ class TestGetActivities:
         assert len(data["Chess Club"]["participants"]) == 2
 
 
+class TestQueryActivities:
+    """Tests for pagination, filtering and projection on GET /activities."""
+
+    def test_paginates_with_cursor(self, client):
+        """Test that following X-Next-Cursor visits every activity once, in order."""
+        names = []
+        cursor = None
+        pages = 0
+        while True:
+            url = "/activities?limit=4" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            names.extend(response.json())
+            pages += 1
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert names == list(client.get("/activities").json())
+
+    def test_projects_fields(self, client):
+        """Test that fields= returns only the requested fields, including computed ones."""
+        response = client.get("/activities?fields=max_participants,spots_left")
+        chess = response.json()["Chess Club"]
+        assert chess == {"max_participants": 12, "spots_left": 10}
+
+    def test_filters_activities_with_openings(self, client):
+        """Test that full activities are excluded by has_openings=true."""
+        for i in range(10):
+            client.post(f"/activities/Chess Club/signup?email=s{i}@mergington.edu")
+
+        data = client.get("/activities?has_openings=true&fields=spots_left").json()
+        assert "Chess Club" not in data
+        assert len(data) == 8
+
+        client.delete("/activities/Chess Club/unregister?email=s0@mergington.edu")
+        data = client.get("/activities?has_openings=true&fields=spots_left").json()
+        assert list(data)[0] == "Chess Club"
+
+    def test_filters_by_day_and_time(self, client):
+        """Test that day=, at= and between= keep activities meeting then."""
+        data = client.get("/activities?day=monday&at=4pm&fields=schedule").json()
+        assert list(data) == ["Swimming Club", "Debate Team"]
+
+        data = client.get("/activities?between=5:15pm-7pm&fields=schedule").json()
+        assert list(data) == ["Basketball Team", "Drama Club"]
+
+        data = client.get("/activities?day=thu&fields=schedule").json()
+        assert list(data) == ["Programming Class", "Basketball Team", "Art Club"]
+
+    def test_rejects_invalid_schedule_filter(self, client):
+        """Test that unreadable days and times return 400."""
+        assert client.get("/activities?day=someday").status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get("/activities?at=25:00").status_code == status.HTTP_400_BAD_REQUEST
+        response = client.get("/activities?at=4pm&between=1pm-2pm")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rejects_unknown_field(self, client):
+        """Test that an unknown projection field returns 400."""
+        response = client.get("/activities?fields=description,secret")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "secret" in response.json()["detail"]
+
+    def test_rejects_empty_fields(self, client):
+        """Test that a fields= parameter naming no fields returns 400."""
+        for fields in ("", ","):
+            response = client.get(f"/activities?fields={fields}")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rejects_invalid_cursor(self, client):
+        """Test that a malformed cursor returns 400."""
+        response = client.get("/activities?limit=2&cursor=not-a-cursor")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestGetActivitiesSummary:
+    """Tests for the GET /activities/summary endpoint."""
+
+    def test_returns_counts_only(self, client):
+        """Test that the summary lists seat counts without emails."""
+        response = client.get("/activities/summary")
+        assert response.status_code == status.HTTP_200_OK
+        summary = response.json()
+        assert len(summary) == 9
+        assert summary[0] == {
+            "name": "Chess Club",
+            "participant_count": 2,
+            "max_participants": 12,
+        }
+
+    def test_counts_follow_mutations(self, client):
+        """Test that signups and unregistrations update the counts and ETag."""
+        etag = client.get("/activities/summary").headers["etag"]
+        client.post("/activities/Chess Club/signup?email=new@mergington.edu")
+        client.delete("/activities/Art Club/unregister?email=mia@mergington.edu")
+
+        response = client.get("/activities/summary", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        counts = {item["name"]: item["participant_count"] for item in response.json()}
+        assert counts["Chess Club"] == 3
+        assert counts["Art Club"] == 1
+
+
+class TestGetActivityChanges:
+    """Tests for the GET /activities/changes endpoint."""
+
+    def test_returns_changes_since_version(self, client):
+        """Test that a client up to date gets only the deltas since its version."""
+        version = client.get("/activities/changes?since=0").json()["version"]
+
+        client.post("/activities/Chess Club/signup?email=new@mergington.edu")
+        client.delete("/activities/Art Club/unregister?email=mia@mergington.edu")
+
+        data = client.get(f"/activities/changes?since={version}").json()
+        assert data["version"] == version + 2
+        assert [(c["op"], c["activity"], c["email"]) for c in data["changes"]] == [
+            ("signup", "Chess Club", "new@mergington.edu"),
+            ("unregister", "Art Club", "mia@mergington.edu"),
+        ]
+        assert [c["version"] for c in data["changes"]] == [version + 1, version + 2]
+
+    def test_current_client_gets_no_changes(self, client):
+        """Test that asking from the current version returns an empty delta."""
+        version = client.get("/activities/changes?since=0").json()["version"]
+        data = client.get(f"/activities/changes?since={version}").json()
+        assert data == {"version": version, "changes": []}
+
+    def test_stale_client_gets_snapshot(self, client):
+        """Test that a version older than the change log falls back to a snapshot."""
+        data = client.get("/activities/changes?since=0").json()
+        assert "changes" not in data
+        assert data["snapshot"] == client.get("/activities").json()
+
+    def test_unknown_future_version_gets_snapshot(self, client):
+        """Test that a version from another store instance gets a snapshot."""
+        version = client.get("/activities/changes?since=0").json()["version"]
+        data = client.get(f"/activities/changes?since={version + 100}").json()
+        assert "snapshot" in data
+
+
+class TestSearchActivities:
+    """Tests for the GET /activities/search endpoint."""
+
+    def test_returns_ranked_matches(self, client):
+        """Test that matching activities come back best first with scores."""
+        response = client.get("/activities/search?q=club&fields=max_participants")
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert {r["name"] for r in results} == {
+            "Chess Club", "Art Club", "Drama Club", "Swimming Club"
+        }
+        assert set(results[0]) == {"name", "score", "max_participants"}
+
+    def test_matches_schedule_words(self, client):
+        """Test that schedule days are searchable."""
+        results = client.get("/activities/search?q=tuesday thursday&limit=1").json()
+        assert len(results) == 1
+        assert "Tuesdays and Thursdays" in results[0]["schedule"]
+
+    def test_requires_query(self, client):
+        """Test that an empty query is rejected."""
+        assert client.get("/activities/search?q=").status_code == 422
+
+
+class TestActivityEvents:
+    """Tests for the GET /activities/events stream."""
+
+    def test_stale_last_event_id_gets_resync(self, client):
+        """Test that a client too far behind is told to resync."""
+        with client.stream("GET", "/activities/events", headers={"Last-Event-ID": "0"}) as response:
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = response.read().decode()
+        assert "event: resync" in body
+
+
+class TestLiveCapacities:
+    """Tests for the /activities/live WebSocket."""
+
+    def test_subscribe_sends_current_capacity(self, client):
+        """Test that subscribing pushes each activity's seat counts."""
+        with client.websocket_connect("/activities/live") as websocket:
+            websocket.send_json({"subscribe": ["Chess Club", "Underwater Basket Weaving"]})
+            assert websocket.receive_json() == {
+                "Chess Club": {"participant_count": 2, "max_participants": 12, "spots_left": 10},
+                "Underwater Basket Weaving": None,
+            }
+
+    def test_invalid_message_reports_error(self, client):
+        """Test that a malformed message gets an error instead of closing the socket."""
+        with client.websocket_connect("/activities/live") as websocket:
+            websocket.send_json({"subscribe": "Chess Club"})
+            assert "error" in websocket.receive_json()
+            websocket.send_json({"subscribe": ["Chess Club"]})
+            assert "Chess Club" in websocket.receive_json()
+
+
+class TestGetActivity:
+    """Tests for the GET /activities/{activity_name} endpoint."""
+
+    def test_returns_single_activity(self, client):
+        """Test that one activity is returned in the catalog's shape."""
+        response = client.get("/activities/Chess Club")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == client.get("/activities").json()["Chess Club"]
+
+    def test_projects_fields(self, client):
+        """Test that fields= applies to a single activity."""
+        response = client.get("/activities/Chess Club?fields=participant_count")
+        assert response.json() == {"participant_count": 2}
+
+    def test_unknown_activity_returns_404(self, client):
+        """Test that a missing activity returns 404."""
+        response = client.get("/activities/Nonexistent Club")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "Activity not found" in response.json()["detail"]
+
+    def test_supports_conditional_get(self, client):
+        """Test that the per-activity ETag yields 304 until the activity changes."""
+        etag = client.get("/activities/Chess Club").headers["etag"]
+        response = client.get("/activities/Chess Club", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/activities/Chess Club/signup?email=new@mergington.edu")
+        response = client.get("/activities/Chess Club", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestGetActivityParticipants:
+    """Tests for the GET /activities/{activity_name}/participants endpoint."""
+
+    def test_returns_full_roster_without_limit(self, client):
+        """Test that the whole roster is returned in signup order."""
+        response = client.get("/activities/Chess Club/participants")
+        assert response.json() == ["michael@mergington.edu", "daniel@mergington.edu"]
+        assert "x-next-cursor" not in response.headers
+
+    def test_paginates_roster(self, client):
+        """Test that following X-Next-Cursor walks the roster page by page."""
+        for i in range(5):
+            client.post(f"/activities/Gym Class/signup?email=s{i}@mergington.edu")
+
+        emails = []
+        cursor = None
+        while True:
+            url = "/activities/Gym Class/participants?limit=3"
+            response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+            page = response.json()
+            assert len(page) <= 3
+            emails.extend(page)
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+
+        assert emails == client.get("/activities").json()["Gym Class"]["participants"]
+
+    def test_unknown_activity_returns_404(self, client):
+        """Test that a missing activity returns 404."""
+        response = client.get("/activities/Nonexistent Club/participants")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestSignupForActivity:
     """Tests for the POST /activities/{activity_name}/signup endpoint."""
+
+    def test_signup_rejects_schedule_conflict(self, client):
+        """Test that joining an activity at the same time as another returns 409."""
+        email = "michael@mergington.edu"
+        response = client.post(f"/activities/Drama Club/signup?email={email}")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json()["detail"] == "Schedule conflicts with Chess Club"
+        assert email not in client.get("/activities/Drama Club").json()["participants"]
+
+    def test_signup_can_allow_conflicts(self, client):
+        """Test that allow_conflicts enrolls anyway and reports the clash."""
+        email = "michael@mergington.edu"
+        response = client.post(f"/activities/Drama Club/signup?email={email}&allow_conflicts=true")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["conflicts"] == ["Chess Club"]
+
+    def test_signup_without_conflict_has_no_warning(self, client):
+        """Test that non-overlapping activities sign up cleanly."""
+        response = client.post("/activities/Gym Class/signup?email=michael@mergington.edu")
+        assert response.status_code == status.HTTP_200_OK
+        assert "conflicts" not in response.json()
     
     def test_signup_for_existing_activity(self, client):
         """Test signing up a new student for an existing activity."""
@@ -116,6 +474,112 @@ class TestSignupForActivity:
         assert response.status_code == status.HTTP_200_OK
 
 
+class TestIdempotencyKeys:
+    """Tests for replaying mutating requests sent with an Idempotency-Key."""
+
+    def test_retried_signup_returns_original_response(self, client):
+        """Test that a retry gets the first 200 instead of 'already signed up'."""
+        url = "/activities/Chess Club/signup?email=new@mergington.edu"
+        headers = {"Idempotency-Key": "retry-1"}
+        first = client.post(url, headers=headers)
+        retry = client.post(url, headers=headers)
+        assert first.status_code == retry.status_code == status.HTTP_200_OK
+        assert retry.json() == first.json()
+        assert "idempotent-replayed" not in first.headers
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert client.post(url).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_retried_unregister_returns_original_response(self, client):
+        """Test that an unregister retry is not reported as 'not signed up'."""
+        url = "/activities/Chess Club/unregister?email=michael@mergington.edu"
+        headers = {"Idempotency-Key": "retry-2"}
+        assert client.delete(url, headers=headers).status_code == status.HTTP_200_OK
+        assert client.delete(url, headers=headers).status_code == status.HTTP_200_OK
+
+    def test_client_errors_are_replayed(self, client):
+        """Test that a rejected request is answered the same way on retry."""
+        url = "/activities/Robotics/signup?email=new@mergington.edu"
+        headers = {"Idempotency-Key": "retry-3"}
+        first = client.post(url, headers=headers)
+        retry = client.post(url, headers=headers)
+        assert first.status_code == retry.status_code == status.HTTP_404_NOT_FOUND
+        assert retry.json() == {"detail": "Activity not found"}
+
+    def test_batch_retry_is_not_reapplied(self, client):
+        """Test that a retried batch replays its per-item results."""
+        body = {"emails": ["a@mergington.edu", "b@mergington.edu"]}
+        headers = {"Idempotency-Key": "retry-4"}
+        first = client.post("/activities/Art Club/signup:batch", json=body, headers=headers)
+        retry = client.post("/activities/Art Club/signup:batch", json=body, headers=headers)
+        assert retry.json() == first.json()
+        assert retry.json()["signed_up"] == 2
+
+    def test_key_reused_for_different_request_returns_422(self, client):
+        """Test that one key cannot be used for two different requests."""
+        headers = {"Idempotency-Key": "retry-5"}
+        client.post("/activities/Chess Club/signup?email=a@mergington.edu", headers=headers)
+        response = client.post(
+            "/activities/Chess Club/signup?email=b@mergington.edu", headers=headers
+        )
+        assert response.status_code == 422
+        participants = client.get("/activities/Chess Club").json()["participants"]
+        assert "b@mergington.edu" not in participants
+
+
+class TestBatchSignup:
+    """Tests for the batch signup endpoints."""
+
+    def test_signs_up_list_of_students(self, client):
+        """Test that every new email is enrolled and duplicates are reported."""
+        emails = [f"s{i}@mergington.edu" for i in range(5)] + ["michael@mergington.edu"]
+        response = client.post("/activities/Chess Club/signup:batch", json={"emails": emails})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["signed_up"] == 5
+        assert [item["status"] for item in data["results"]] == [200] * 5 + [400]
+        assert data["results"][0] == {
+            "activity": "Chess Club",
+            "email": "s0@mergington.edu",
+            "status": 200,
+            "message": "Signed up s0@mergington.edu for Chess Club",
+        }
+        participants = client.get("/activities/Chess Club").json()["participants"]
+        assert participants[-5:] == emails[:5]
+
+    def test_reports_full_activity_per_item(self, client):
+        """Test that signups beyond capacity fail individually with 409."""
+        emails = [f"s{i}@mergington.edu" for i in range(12)]
+        data = client.post("/activities/Chess Club/signup:batch", json={"emails": emails}).json()
+        assert data["signed_up"] == 10
+        assert [item["status"] for item in data["results"][10:]] == [409, 409]
+
+    def test_unknown_activity_returns_404(self, client):
+        """Test that a batch for a missing activity is rejected as a whole."""
+        response = client.post("/activities/Robotics/signup:batch", json={"emails": ["a@b"]})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_rejects_oversized_batch(self, client):
+        """Test that batches are capped."""
+        emails = [f"s{i}@mergington.edu" for i in range(1001)]
+        response = client.post("/activities/Gym Class/signup:batch", json={"emails": emails})
+        assert response.status_code == 422
+
+    def test_signs_up_across_activities(self, client):
+        """Test that one request can enroll students in different activities."""
+        signups = [
+            {"activity": "Chess Club", "email": "a@mergington.edu"},
+            {"activity": "Gym Class", "email": "a@mergington.edu"},
+            {"activity": "Drama Club", "email": "a@mergington.edu"},
+            {"activity": "Robotics", "email": "a@mergington.edu"},
+        ]
+        data = client.post("/activities/signup:batch", json={"signups": signups}).json()
+        assert [item["status"] for item in data["results"]] == [200, 200, 409, 404]
+        assert data["results"][2]["detail"] == "Schedule conflicts with Chess Club"
+        assert client.get("/students/a@mergington.edu/activities").json() == [
+            "Chess Club", "Gym Class"
+        ]
+
+
 class TestUnregisterFromActivity:
     """Tests for the DELETE /activities/{activity_name}/unregister endpoint."""
     
@@ -197,6 +661,169 @@ class TestUnregisterFromActivity:
         activities_data = activities_response.json()
         assert email not in activities_data[activity]["participants"]
 
+    def test_participants_keep_signup_order_after_unregister(self, client):
+        """Test that removing a participant preserves the order of the rest."""
+        client.post("/activities/Chess Club/signup?email=first@mergington.edu")
+        client.post("/activities/Chess Club/signup?email=second@mergington.edu")
+        client.delete("/activities/Chess Club/unregister?email=daniel@mergington.edu")
+
+        activities_data = client.get("/activities").json()
+        assert activities_data["Chess Club"]["participants"] == [
+            "michael@mergington.edu",
+            "first@mergington.edu",
+            "second@mergington.edu",
+        ]
+
+
+class TestBatchUnregister:
+    """Tests for batch unregister and clearing a roster."""
+
+    def test_unregisters_list_of_students(self, client):
+        """Test that listed participants are removed and unknown ones reported."""
+        response = client.post(
+            "/activities/Chess Club/unregister:batch",
+            json={"emails": ["michael@mergington.edu", "emma@mergington.edu"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["unregistered"] == 1
+        assert data["results"] == [
+            {"email": "michael@mergington.edu", "status": 200,
+             "message": "Unregistered michael@mergington.edu from Chess Club"},
+            {"email": "emma@mergington.edu", "status": 400,
+             "detail": "Student is not signed up for this activity"},
+        ]
+        assert client.get("/activities/Chess Club").json()["participants"] == [
+            "daniel@mergington.edu"
+        ]
+
+    def test_clears_roster(self, client):
+        """Test that DELETE on participants empties the roster."""
+        response = client.delete("/activities/Chess Club/participants")
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["email"] for item in response.json()["results"]] == [
+            "michael@mergington.edu", "daniel@mergington.edu"
+        ]
+        assert client.get("/activities/Chess Club").json()["participants"] == []
+        assert client.get("/students/michael@mergington.edu/activities").json() == []
+
+    def test_unknown_activity_returns_404(self, client):
+        """Test that both operations report a missing activity."""
+        response = client.post("/activities/Robotics/unregister:batch", json={"emails": []})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete("/activities/Robotics/participants").status_code == 404
+
+
+class TestImportRoster:
+    """Tests for the POST /activities/import endpoint."""
+
+    def test_imports_csv_body(self, client):
+        """Test that a CSV body is applied and summarized."""
+        response = client.post(
+            "/activities/import",
+            content="activity,email\nArt Club,new@mergington.edu\nRobotics,new@mergington.edu\n",
+            headers={"Content-Type": "text/csv"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["rows"], data["accepted"], data["unknown_activity"]) == (2, 1, 1)
+        assert client.get("/students/new@mergington.edu/activities").json() == ["Art Club"]
+
+    def test_format_parameter_overrides_content_type(self, client):
+        """Test that format= selects the parser for an untyped body."""
+        response = client.post(
+            "/activities/import?format=ndjson",
+            content='{"activity": "Art Club", "email": "new@mergington.edu"}\n',
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert response.json()["accepted"] == 1
+
+    def test_unknown_format_returns_400(self, client):
+        """Test that a body of unknown type is refused."""
+        response = client.post("/activities/import", content="activity,email\n")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bad_header_returns_400(self, client):
+        """Test that a CSV file without the required columns is refused."""
+        response = client.post(
+            "/activities/import", content="name\nx\n", headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "header" in response.json()["detail"]["error"]
+
+
+class TestExportRosters:
+    """Tests for the GET /export endpoint."""
+
+    def test_csv_has_one_row_per_enrollment(self, client):
+        """Test that the CSV export lists every activity/email pair."""
+        response = client.get("/export?format=csv")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.splitlines()
+        assert lines[:3] == [
+            "activity,email",
+            "Chess Club,michael@mergington.edu",
+            "Chess Club,daniel@mergington.edu",
+        ]
+        expected = client.get("/activities").json()
+        assert len(lines) - 1 == sum(len(a["participants"]) for a in expected.values())
+
+    def test_json_matches_activities(self, client):
+        """Test that the JSON export is the GET /activities object."""
+        response = client.get("/export?format=json")
+        assert response.json() == client.get("/activities").json()
+
+    def test_ndjson_round_trips_through_import(self, client):
+        """Test that an NDJSON export can be imported into an emptied store."""
+        exported = client.get("/export?format=ndjson").content
+        client.delete("/activities/Chess Club/participants")
+        response = client.post(
+            "/activities/import", content=exported,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.json()["accepted"] == 2
+        assert client.get("/activities/Chess Club").json()["participants"] == [
+            "michael@mergington.edu", "daniel@mergington.edu"
+        ]
+
+    def test_unknown_format_returns_400(self, client):
+        """Test that formats other than csv, ndjson and json are refused."""
+        response = client.get("/export?format=xml")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestGetStudentActivities:
+    """Tests for the GET /students/{email}/activities endpoint."""
+
+    def test_lists_initial_enrollments(self, client):
+        """Test that seeded participants are indexed by email."""
+        response = client.get("/students/michael@mergington.edu/activities")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == ["Chess Club"]
+
+    def test_unknown_student_has_no_activities(self, client):
+        """Test that a student with no signups gets an empty list."""
+        response = client.get("/students/nobody@mergington.edu/activities")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    def test_tracks_signup_and_unregister(self, client):
+        """Test that the index follows signups and unregistrations."""
+        email = "multi@mergington.edu"
+        client.post(f"/activities/Chess Club/signup?email={email}")
+        client.post(f"/activities/Art Club/signup?email={email}")
+        assert client.get(f"/students/{email}/activities").json() == [
+            "Chess Club",
+            "Art Club",
+        ]
+
+        client.delete(f"/activities/Chess Club/unregister?email={email}")
+        assert client.get(f"/students/{email}/activities").json() == ["Art Club"]
+
+        client.delete(f"/activities/Art Club/unregister?email={email}")
+        assert client.get(f"/students/{email}/activities").json() == []
+
 
 class TestActivityCapacity:
     """Tests related to activity capacity and participant limits."""
@@ -218,6 +845,19 @@ class TestActivityCapacity:
         
         assert new_count == initial_count + 1
     
+    def test_signup_for_full_activity_returns_409(self, client):
+        """Test that signing up once every seat is taken is rejected."""
+        for i in range(10):
+            response = client.post(f"/activities/Chess Club/signup?email=s{i}@mergington.edu")
+            assert response.status_code == status.HTTP_200_OK
+
+        response = client.post("/activities/Chess Club/signup?email=late@mergington.edu")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert "full" in response.json()["detail"]
+
+        activities_data = client.get("/activities").json()
+        assert len(activities_data["Chess Club"]["participants"]) == 12
+
     def test_max_participants_field_exists(self, client):
         """Test that all activities have a max_participants field."""
         response = client.get("/activities")
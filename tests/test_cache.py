@@ -0,0 +1,134 @@
+"""
+Tests for the version-keyed response cache.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.cache import IdempotencyCache, IdempotencyKeyReusedError, ResponseCache
+
+
+class TestResponseCache:
+    """Tests for caching encoded response bodies."""
+
+    def test_reuses_body_for_same_version(self):
+        """Test that a body is built once per version."""
+        cache = ResponseCache()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"Chess Club": {"participants": []}}
+
+        first = cache.get("activities", 1, build)
+        assert cache.get("activities", 1, build) is first
+        assert len(builds) == 1
+        assert json.loads(first.body) == {"Chess Club": {"participants": []}}
+
+    def test_rebuilds_after_version_change(self):
+        """Test that a new version invalidates the cached body."""
+        cache = ResponseCache()
+        cache.get("activities", 1, lambda: {"v": 1})
+        assert json.loads(cache.get("activities", 2, lambda: {"v": 2}).body) == {"v": 2}
+
+    def test_older_version_does_not_replace_newer(self):
+        """Test that a slow reader cannot overwrite a newer body."""
+        cache = ResponseCache()
+        cache.get("activities", 2, lambda: {"v": 2})
+        cache.get("activities", 1, lambda: {"v": 1})
+        assert json.loads(cache.get("activities", 2, lambda: {"v": "rebuilt"}).body) == {"v": 2}
+
+    def test_etag_tracks_content(self):
+        """Test that equal bodies share an ETag and different bodies do not."""
+        cache = ResponseCache()
+        first = cache.get("a", 1, lambda: {"v": 1})
+        same = cache.get("b", 7, lambda: {"v": 1})
+        changed = cache.get("a", 2, lambda: {"v": 2})
+        assert first.etag == same.etag
+        assert first.etag != changed.etag
+        assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIdempotencyCache:
+    """Tests for storing and replaying responses by Idempotency-Key."""
+
+    def test_entries_expire_after_ttl(self):
+        """Test that a stored response is only replayed within its TTL."""
+        clock = FakeClock()
+        cache = IdempotencyCache(ttl=60, clock=clock)
+        cache.put("key", "f", 200, b"{}")
+        clock.now = 59
+        assert cache.get("key").status_code == 200
+        clock.now = 60
+        assert cache.get("key") is None
+        assert cache.size == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test that the entry used longest ago goes first when full."""
+        cache = IdempotencyCache(max_entries=2)
+        cache.put("a", "f", 200, b"a")
+        cache.put("b", "f", 200, b"b")
+        cache.get("a")
+        cache.put("c", "f", 200, b"c")
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+    def test_memory_cap_bounds_stored_bodies(self):
+        """Test that bodies are evicted to stay under max_bytes, and huge ones skipped."""
+        cache = IdempotencyCache(max_bytes=3000)
+        for n in range(10):
+            cache.put(f"key{n}", "f", 200, b"x" * 500)
+        assert cache.size <= 3000
+        assert len(cache) == 3
+        cache.put("huge", "f", 200, b"x" * 5000)
+        assert cache.get("huge") is None
+
+    def test_run_executes_once_and_replays(self):
+        """Test that concurrent and later repeats share the first execution."""
+        cache = IdempotencyCache()
+        calls = []
+
+        async def execute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 200, b'{"ok":true}'
+
+        async def run():
+            concurrent = await asyncio.gather(*(cache.run("key", "f", execute) for _ in range(3)))
+            return concurrent, await cache.run("key", "f", execute)
+
+        concurrent, later = asyncio.run(run())
+        assert len(calls) == 1
+        assert [replayed for _, _, replayed in concurrent] == [False, True, True]
+        assert later == (200, b'{"ok":true}', True)
+
+    def test_failed_execution_is_not_stored(self):
+        """Test that a request that raised is run again on retry."""
+        cache = IdempotencyCache()
+
+        async def fail():
+            raise RuntimeError("database unavailable")
+
+        async def succeed():
+            return 200, b"{}"
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.run("key", "f", fail))
+        assert asyncio.run(cache.run("key", "f", succeed)) == (200, b"{}", False)
+
+    def test_key_reused_for_different_request(self):
+        """Test that a key cannot replay a response to a different request."""
+        cache = IdempotencyCache()
+        cache.put("key", "signup a", 200, b"{}")
+        with pytest.raises(IdempotencyKeyReusedError):
+            asyncio.run(cache.run("key", "signup b", None))
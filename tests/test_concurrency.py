@@ -0,0 +1,144 @@
+"""
+Concurrency stress tests for capacity and schedule conflict enforcement.
+"""
+
+import threading
+
+import pytest
+
+from src.storage import (
+    ActivityFullError,
+    JournaledStore,
+    MemoryStore,
+    ScheduleConflictError,
+    SQLiteStore,
+)
+
+CAPACITY = 50
+THREADS = 32
+SIGNUPS_PER_THREAD = 40
+# Default number of recent changes every backend keeps
+CHANGE_LOG_SIZE = 1000
+
+
+@pytest.fixture(params=["memory", "journal", "sqlite"])
+def store(request, tmp_path):
+    """Create a store of each backend type holding one small activity."""
+    if request.param == "memory":
+        backend = MemoryStore()
+    elif request.param == "journal":
+        backend = JournaledStore(str(tmp_path / "journal"), durability="async")
+    else:
+        backend = SQLiteStore(str(tmp_path / "activities.db"), "async")
+    backend.load({
+        "Robotics Club": {
+            "description": "Build robots",
+            "schedule": "Fridays, 3:30 PM - 5:00 PM",
+            "max_participants": CAPACITY,
+            "participants": [],
+        }
+    })
+    yield backend
+    backend.close()
+
+
+def test_capacity_is_never_exceeded(store):
+    """Test that a burst of concurrent signups fills exactly the available seats."""
+    accepted = []
+    rejected = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(n):
+        barrier.wait()
+        for i in range(SIGNUPS_PER_THREAD):
+            email = f"t{n}-{i}@mergington.edu"
+            try:
+                store.signup("Robotics Club", email)
+                accepted.append(email)
+            except ActivityFullError:
+                rejected.append(email)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    participants = store.list_activities()["Robotics Club"]["participants"]
+    assert len(participants) == CAPACITY
+    assert sorted(participants) == sorted(accepted)
+    assert len(rejected) == THREADS * SIGNUPS_PER_THREAD - CAPACITY
+
+
+def test_seat_is_reusable_after_unregister(store):
+    """Test that unregistering from a full activity frees a seat."""
+    for i in range(CAPACITY):
+        store.signup("Robotics Club", f"s{i}@mergington.edu")
+    with pytest.raises(ActivityFullError):
+        store.signup("Robotics Club", "late@mergington.edu")
+
+    store.unregister("Robotics Club", "s0@mergington.edu")
+    store.signup("Robotics Club", "late@mergington.edu")
+
+
+def test_concurrent_conflicting_signups_admit_one(store):
+    """Test that racing signups for two clashing activities enroll a student in only one."""
+    store.load({
+        name: {
+            "description": "",
+            "schedule": "Fridays, 3:30 PM - 5:00 PM",
+            "max_participants": THREADS,
+            "participants": [],
+        }
+        for name in ("Robotics Club", "Chess Club")
+    })
+    barrier = threading.Barrier(THREADS)
+
+    def worker(n):
+        barrier.wait()
+        activity = "Robotics Club" if n % 2 else "Chess Club"
+        try:
+            store.signup(activity, f"s{n // 2}@mergington.edu")
+        except ScheduleConflictError:
+            pass
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(THREADS // 2):
+        assert len(store.get_student_activities(f"s{i}@mergington.edu")) == 1
+
+
+def test_recent_changes_are_complete_during_writes(store):
+    """Test that reading recent changes while writers run never reports a gap."""
+    start = store.version
+    stop = threading.Event()
+
+    def writer(n):
+        email = f"w{n}@mergington.edu"
+        while not stop.is_set():
+            store.signup("Robotics Club", email)
+            store.unregister("Robotics Club", email)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        gaps = 0
+        for _ in range(5000):
+            since = max(start, store.version - 5)
+            version, changes = store.get_changes(since)
+            # Writers may push the events out of the log between the two
+            # reads; anything newer than the log's size must still be there
+            if changes is None:
+                gaps += version - since < CHANGE_LOG_SIZE
+            else:
+                assert len(changes) == version - since
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert gaps == 0
@@ -0,0 +1,194 @@
+"""
+Tests for fanning change events out to Server-Sent Events subscribers.
+"""
+
+import asyncio
+import json
+
+from src.events import Broadcaster, CapacityFeed, format_sse, stream_events
+from src.storage import MemoryStore
+from tests.test_storage import SAMPLE_ACTIVITIES
+
+
+def make_broadcaster(store, **kwargs):
+    async def fetch_changes(since):
+        return store.get_changes(since)
+
+    return Broadcaster(fetch_changes, **kwargs)
+
+
+def make_capacity_feed(store, broadcaster, **kwargs):
+    async def read_capacities(names):
+        fields = ["participant_count", "spots_left"]
+        return store.version, {name: store.get_activity(name, fields) for name in names}
+
+    return CapacityFeed(broadcaster, read_capacities, **kwargs)
+
+
+def parse_sse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class TestBroadcaster:
+    """Tests for the change event broadcaster."""
+
+    def test_delivers_changes_to_every_subscriber(self):
+        """Test that each notified change reaches all subscribers in order."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store)
+            first = broadcaster.subscribe(store.version)
+            second = broadcaster.subscribe(store.version)
+            store.signup("Chess Club", "new@mergington.edu")
+            store.unregister("Art Club", "mia@mergington.edu")
+            broadcaster.notify()
+            return [
+                [await asyncio.wait_for(sub.queue.get(), 1) for _ in range(2)]
+                for sub in (first, second)
+            ]
+
+        for events in asyncio.run(run()):
+            assert [(e["op"], e["activity"]) for e in events] == [
+                ("signup", "Chess Club"),
+                ("unregister", "Art Club"),
+            ]
+
+    def test_slow_subscriber_is_dropped_without_blocking(self):
+        """Test that a full queue drops its subscriber but not the others."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store, queue_size=1)
+            slow = broadcaster.subscribe(store.version)
+            fast = broadcaster.subscribe(store.version)
+            store.signup("Chess Club", "one@mergington.edu")
+            broadcaster.notify()
+            await asyncio.wait_for(fast.queue.get(), 1)
+            store.signup("Chess Club", "two@mergington.edu")
+            broadcaster.notify()
+            await asyncio.wait_for(fast.queue.get(), 1)
+            return broadcaster, slow
+
+        broadcaster, slow = asyncio.run(run())
+        assert slow.dropped
+        assert broadcaster.subscriber_count == 1
+
+    def test_resyncs_when_change_log_is_incomplete(self):
+        """Test that a reload is broadcast as a resync event."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store)
+            subscription = broadcaster.subscribe(store.version)
+            store.load(SAMPLE_ACTIVITIES)
+            broadcaster.notify()
+            return await asyncio.wait_for(subscription.queue.get(), 1)
+
+        assert asyncio.run(run()) == {"version": store.version, "op": "resync"}
+
+
+class TestStreamEvents:
+    """Tests for encoding a subscription as Server-Sent Events."""
+
+    def test_formats_event_with_version_id(self):
+        """Test that the event id is the store version."""
+        message = format_sse({"version": 7, "op": "signup", "activity": "Chess Club", "email": "a"})
+        assert message.startswith("id: 7\nevent: signup\n")
+        assert message.endswith("\n\n")
+
+    def test_sends_backlog_then_live_events(self):
+        """Test that missed events are replayed before live ones."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+        start = store.version
+        store.signup("Chess Club", "missed@mergington.edu")
+
+        async def run():
+            broadcaster = make_broadcaster(store)
+            subscription = broadcaster.subscribe(store.version)
+            _, backlog = store.get_changes(start)
+            stream = stream_events(broadcaster, subscription, backlog)
+            missed = await anext(stream)
+            store.signup("Chess Club", "live@mergington.edu")
+            broadcaster.notify()
+            live = await asyncio.wait_for(anext(stream), 1)
+            await stream.aclose()
+            return missed, live, broadcaster.subscriber_count
+
+        missed, live, subscribers = asyncio.run(run())
+        assert parse_sse(missed)[1]["email"] == "missed@mergington.edu"
+        assert parse_sse(live)[1]["email"] == "live@mergington.edu"
+        assert subscribers == 0
+
+    def test_dropped_subscriber_ends_with_resync(self):
+        """Test that a dropped subscriber drains its queue and is told to resync."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store, queue_size=1)
+            subscription = broadcaster.subscribe(store.version)
+            broadcaster.publish({"version": 1, "op": "signup"})
+            broadcaster.publish({"version": 2, "op": "signup"})
+            return [message async for message in stream_events(broadcaster, subscription)]
+
+        messages = asyncio.run(run())
+        assert [parse_sse(message)[0] for message in messages] == ["signup", "resync"]
+
+
+class TestCapacityFeed:
+    """Tests for coalesced capacity updates."""
+
+    def test_coalesces_changes_per_activity(self):
+        """Test that a burst of signups reaches a watcher as one update."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store)
+            feed = make_capacity_feed(store, broadcaster, updates_per_second=50)
+            channel = feed.connect()
+            updates = channel.updates()
+            feed.watch(channel, ["Chess Club"])
+            initial = await asyncio.wait_for(anext(updates), 1)
+
+            for i in range(5):
+                store.signup("Chess Club", f"s{i}@mergington.edu")
+                broadcaster.notify()
+            store.signup("Art Club", "unwatched@mergington.edu")
+            broadcaster.notify()
+            burst = await asyncio.wait_for(anext(updates), 1)
+            await asyncio.sleep(feed.interval * 3)
+            feed.disconnect(channel)
+            return initial, burst, channel.pending, feed.watched_count
+
+        initial, burst, pending, watched = asyncio.run(run())
+        assert initial == {"Chess Club": {"participant_count": 2, "spots_left": 10}}
+        assert burst == {"Chess Club": {"participant_count": 7, "spots_left": 5}}
+        assert pending == {}
+        assert watched == 0
+
+    def test_unwatched_activity_sends_nothing(self):
+        """Test that unsubscribing stops updates for that activity."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+
+        async def run():
+            broadcaster = make_broadcaster(store)
+            feed = make_capacity_feed(store, broadcaster, updates_per_second=50)
+            channel = feed.connect()
+            feed.watch(channel, ["Chess Club", "Art Club"])
+            await asyncio.sleep(feed.interval * 3)
+            channel.pending.clear()
+            feed.unwatch(channel, ["Chess Club"])
+            store.signup("Chess Club", "s@mergington.edu")
+            broadcaster.notify()
+            await asyncio.sleep(feed.interval * 3)
+            return channel.pending
+
+        assert asyncio.run(run()) == {}
@@ -0,0 +1,167 @@
+"""
+Tests for streaming roster imports.
+"""
+
+import io
+import json
+
+import pytest
+
+from src.importer import RosterImport, import_file, main
+from src.storage import MemoryStore, SQLiteStore
+from tests.test_storage import SAMPLE_ACTIVITIES
+
+
+@pytest.fixture
+def store():
+    store = MemoryStore()
+    store.load(SAMPLE_ACTIVITIES)
+    return store
+
+
+def run_import(store, text, format="csv", read_size=64 * 1024):
+    return import_file(store, io.BytesIO(text.encode()), format, read_size=read_size)
+
+
+class TestRosterImport:
+    """Tests for parsing input that arrives in arbitrary chunks."""
+
+    def test_rows_split_across_chunks(self):
+        """Test that rows are reassembled whatever the chunk boundaries."""
+        data = "﻿activity,email\r\nChess Club,a@m.edu\r\nArt Club,b@m.edu\r\n".encode()
+        roster_import = RosterImport("csv")
+        batches = []
+        for index in range(0, len(data), 3):
+            batches += roster_import.feed(data[index:index + 3])
+        batches += roster_import.finish()
+        assert batches == [[(2, "Chess Club", "a@m.edu"), (3, "Art Club", "b@m.edu")]]
+
+    def test_batches_are_bounded(self):
+        """Test that ready rows are handed out in batches of chunk_rows."""
+        roster_import = RosterImport("ndjson", chunk_rows=2)
+        lines = "".join(
+            json.dumps({"activity": "Chess Club", "email": f"s{index}@m.edu"}) + "\n"
+            for index in range(5)
+        )
+        assert [len(rows) for rows in roster_import.feed(lines.encode())] == [2, 2]
+        assert [len(rows) for rows in roster_import.finish()] == [1]
+
+    def test_quoted_field_spanning_lines(self):
+        """Test that a quoted CSV field may contain commas and newlines."""
+        roster_import = RosterImport("csv")
+        roster_import.feed(b'email,activity\nx@m.edu,"Chess\nClub, Advanced"\ny@m.edu,Art Club\n')
+        assert roster_import.finish() == [
+            [(2, "Chess\nClub, Advanced", "x@m.edu"), (4, "Art Club", "y@m.edu")]
+        ]
+
+    def test_stray_quote_inside_field_is_literal(self):
+        """Test that a quote not opening a field does not swallow later rows."""
+        data = "activity,email\nChess Club,o\"brien@m.edu\n" + "".join(
+            f"Art Club,s{index}@m.edu\n" for index in range(5)
+        )
+        roster_import = RosterImport("csv")
+        batches = roster_import.feed(data.encode()) + roster_import.finish()
+        assert batches[0][0] == (2, "Chess Club", 'o"brien@m.edu')
+        assert len(batches[0]) == 6
+
+    def test_escaped_quotes_inside_quoted_field(self):
+        """Test that doubled quotes keep a quoted field open across a line break."""
+        roster_import = RosterImport("csv")
+        roster_import.feed(b'activity,email\n"Say ""hi""\nClub",a@m.edu\nArt Club,b@m.edu\n')
+        assert roster_import.finish() == [
+            [(2, 'Say "hi"\nClub', "a@m.edu"), (4, "Art Club", "b@m.edu")]
+        ]
+
+    def test_unterminated_quote_rejects_only_its_line(self, monkeypatch):
+        """Test that a record spanning too many lines is dropped and the rest reread."""
+        monkeypatch.setattr("src.importer.MAX_RECORD_LINES", 3)
+        data = "activity,email\n\"Chess Club,a@m.edu\n" + "".join(
+            f"Art Club,s{index}@m.edu\n" for index in range(5)
+        )
+        roster_import = RosterImport("csv")
+        batches = roster_import.feed(data.encode())
+        assert len(roster_import._record) <= 3
+        batches += roster_import.finish()
+        assert [row[0] for row in batches[0]] == [3, 4, 5, 6, 7]
+        assert roster_import.summary()["errors"] == [
+            {"line": 2, "reason": "unterminated quoted field"}
+        ]
+
+    def test_rejects_header_without_columns(self):
+        """Test that a CSV file must name its activity and email columns."""
+        with pytest.raises(ValueError):
+            RosterImport("csv").feed(b"name,address\n")
+
+
+class TestImportFile:
+    """Tests for applying an import to a store."""
+
+    def test_counts_each_outcome(self, store):
+        """Test that accepted, duplicate, unknown and invalid rows are tallied."""
+        summary = run_import(store, (
+            "activity,email\n"
+            "Chess Club,new@mergington.edu\n"
+            "Chess Club,michael@mergington.edu\n"
+            "Robotics,new@mergington.edu\n"
+            "Art Club,\n"
+            "Art Club,new@mergington.edu\n"
+        ), read_size=7)
+        assert summary == {
+            "rows": 5, "accepted": 2, "duplicate": 1, "unknown_activity": 1,
+            "full": 0, "conflict": 0, "invalid": 1,
+            "errors": [
+                {"line": 3, "reason": "duplicate"},
+                {"line": 4, "reason": "unknown_activity"},
+                {"line": 5, "reason": "missing activity or email"},
+            ],
+        }
+        assert store.get_student_activities("new@mergington.edu") == ["Chess Club", "Art Club"]
+
+    def test_ndjson_rows(self, store):
+        """Test that NDJSON lines are imported and malformed lines reported."""
+        summary = run_import(store, (
+            '{"activity": "Art Club", "email": "new@mergington.edu"}\n'
+            "\n"
+            "not json\n"
+            '["Art Club", "x@mergington.edu"]\n'
+        ), format="ndjson")
+        assert summary["accepted"] == 1
+        assert summary["errors"] == [
+            {"line": 3, "reason": "invalid JSON"},
+            {"line": 4, "reason": "expected an object"},
+        ]
+
+    def test_full_activity(self, store):
+        """Test that rows past an activity's capacity are counted as full."""
+        rows = "".join(f"Chess Club,s{index}@mergington.edu\n" for index in range(12))
+        summary = run_import(store, "activity,email\n" + rows)
+        assert summary["accepted"] == 10
+        assert summary["full"] == 2
+
+
+class TestMain:
+    """Tests for the command-line entry point."""
+
+    def test_imports_into_database(self, monkeypatch, tmp_path, capsys):
+        """Test that the CLI imports into ACTIVITIES_DB and prints the summary."""
+        db_path = str(tmp_path / "activities.db")
+        store = SQLiteStore(db_path)
+        store.load(SAMPLE_ACTIVITIES)
+        store.close()
+        path = tmp_path / "enrollments.csv"
+        path.write_text("activity,email\nArt Club,new@mergington.edu\n")
+
+        monkeypatch.setenv("ACTIVITIES_DB", db_path)
+        main([str(path)])
+        assert json.loads(capsys.readouterr().out)["accepted"] == 1
+
+        store = SQLiteStore(db_path)
+        assert store.get_student_activities("new@mergington.edu") == ["Art Club"]
+        store.close()
+
+    def test_requires_persistent_store(self, monkeypatch, tmp_path):
+        """Test that the CLI refuses to import into a throwaway in-memory store."""
+        monkeypatch.delenv("ACTIVITIES_DB", raising=False)
+        monkeypatch.delenv("ACTIVITIES_JOURNAL", raising=False)
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "enrollments.csv")])
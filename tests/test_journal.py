@@ -0,0 +1,133 @@
+"""
+Tests for the write-ahead-logged in-memory store.
+"""
+
+import os
+import threading
+
+import pytest
+
+from src.storage import DURABILITY_MODES, JournaledStore
+from tests.test_storage import SAMPLE_ACTIVITIES
+
+
+def reopen(store):
+    """Close a store and recover a new one from the same directory."""
+    store.close()
+    return JournaledStore(
+        store.directory,
+        snapshot_every=store.snapshot_every,
+        durability=store.durability,
+    )
+
+
+class TestJournaledStore:
+    """Tests for logging, snapshotting and recovery."""
+
+    def test_recovers_logged_mutations(self, tmp_path):
+        """Test that signups and unregistrations survive a restart."""
+        store = JournaledStore(str(tmp_path))
+        store.seed(SAMPLE_ACTIVITIES)
+        store.signup("Art Club", "new@mergington.edu")
+        store.unregister("Chess Club", "michael@mergington.edu")
+
+        recovered = reopen(store)
+        assert recovered.list_activities() == store.list_activities()
+        assert recovered.get_student_activities("new@mergington.edu") == ["Art Club"]
+        recovered.close()
+
+    def test_snapshot_compacts_log(self, tmp_path):
+        """Test that snapshots drop covered segments and recovery replays the tail."""
+        store = JournaledStore(str(tmp_path), snapshot_every=3)
+        store.seed(SAMPLE_ACTIVITIES)
+        for i in range(7):
+            store.signup("Art Club", f"student{i}@mergington.edu")
+
+        segments = [name for name in os.listdir(tmp_path) if name.endswith(".log")]
+        assert len(segments) == 1
+
+        recovered = reopen(store)
+        assert recovered.list_activities() == store.list_activities()
+        recovered.close()
+
+    def test_ignores_torn_final_record(self, tmp_path):
+        """Test that a partially written last record is discarded on recovery."""
+        store = JournaledStore(str(tmp_path))
+        store.seed(SAMPLE_ACTIVITIES)
+        store.signup("Art Club", "kept@mergington.edu")
+        store.close()
+        with open(store._journal.path, "ab") as file:
+            file.write(b'{"lsn": 99, "op": "signup", "activ')
+
+        recovered = JournaledStore(str(tmp_path))
+        assert recovered.get_student_activities("kept@mergington.edu") == ["Art Club"]
+        recovered.signup("Chess Club", "after@mergington.edu")
+
+        again = reopen(recovered)
+        assert again.get_student_activities("after@mergington.edu") == ["Chess Club"]
+        again.close()
+
+    def test_torn_record_in_reopened_segment(self, tmp_path):
+        """Test that appending after a torn record in the active segment is safe."""
+        store = JournaledStore(str(tmp_path))
+        store.seed(SAMPLE_ACTIVITIES)
+        store.close()
+        with open(store._journal.path, "ab") as file:
+            file.write(b'{"lsn": 1, "op": "sig')
+
+        recovered = JournaledStore(str(tmp_path))
+        recovered.signup("Chess Club", "after@mergington.edu")
+
+        again = reopen(recovered)
+        assert again.get_student_activities("after@mergington.edu") == ["Chess Club"]
+        again.close()
+
+    def test_concurrent_signups_are_all_durable(self, tmp_path):
+        """Test that group-committed signups from many threads are all recovered."""
+        store = JournaledStore(str(tmp_path))
+        store.seed({
+            "Art Club": {**SAMPLE_ACTIVITIES["Art Club"], "max_participants": 500}
+        })
+
+        def worker(n):
+            for i in range(25):
+                store.signup("Art Club", f"t{n}-{i}@mergington.edu")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        recovered = reopen(store)
+        assert len(recovered.list_activities()["Art Club"]["participants"]) == 1 + 8 * 25
+        recovered.close()
+
+
+class TestDurabilityModes:
+    """Tests for the fsync, batched and async durability modes."""
+
+    @pytest.mark.parametrize("durability", DURABILITY_MODES)
+    def test_every_mode_recovers_after_clean_shutdown(self, tmp_path, durability):
+        """Test that closing the store flushes pending records in every mode."""
+        store = JournaledStore(str(tmp_path), durability=durability)
+        store.seed(SAMPLE_ACTIVITIES)
+        for i in range(10):
+            store.signup("Art Club", f"student{i}@mergington.edu")
+
+        recovered = reopen(store)
+        assert recovered.list_activities() == store.list_activities()
+        recovered.close()
+
+    def test_batched_mode_acknowledges_after_flush(self, tmp_path):
+        """Test that a batched signup is on disk by the time it returns."""
+        store = JournaledStore(str(tmp_path), durability="batched")
+        store.seed(SAMPLE_ACTIVITIES)
+        store.signup("Art Club", "new@mergington.edu")
+        assert store._journal._synced >= store._journal.lsn
+        store.close()
+
+    def test_rejects_unknown_mode(self, tmp_path):
+        """Test that an unsupported durability mode is refused."""
+        with pytest.raises(ValueError):
+            JournaledStore(str(tmp_path), durability="sometimes")
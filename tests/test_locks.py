@@ -0,0 +1,53 @@
+"""
+Tests for lock striping.
+"""
+
+import threading
+
+from src.storage.locks import LockStripes
+
+
+class TestLockStripes:
+    """Tests for the striped lock pool."""
+
+    def test_same_key_is_mutually_exclusive(self):
+        """Test that a key's stripe is held for the duration of the block."""
+        stripes = LockStripes(8)
+        with stripes.acquire("Chess Club"):
+            acquired = stripes._locks[hash("Chess Club") % 8].acquire(blocking=False)
+            assert not acquired
+
+    def test_keys_sharing_a_stripe_do_not_self_deadlock(self):
+        """Test that acquiring several keys on one stripe takes it only once."""
+        stripes = LockStripes(1)
+        with stripes.acquire("Chess Club", "Art Club"):
+            pass
+
+    def test_multi_key_acquisition_does_not_deadlock(self):
+        """Test that opposite key orders from many threads always make progress."""
+        stripes = LockStripes(4)
+        keys = [f"Activity {i}" for i in range(8)]
+        counter = []
+
+        def worker(order):
+            for _ in range(200):
+                with stripes.acquire(*order):
+                    counter.append(1)
+
+        threads = [
+            threading.Thread(target=worker, args=(keys if n % 2 else keys[::-1],))
+            for n in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert not any(thread.is_alive() for thread in threads)
+        assert len(counter) == 8 * 200
+
+    def test_acquire_all_blocks_every_key(self):
+        """Test that acquire_all holds every stripe."""
+        stripes = LockStripes(4)
+        with stripes.acquire_all():
+            assert all(lock.locked() for lock in stripes._locks)
+        assert not any(lock.locked() for lock in stripes._locks)
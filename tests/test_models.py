@@ -0,0 +1,74 @@
+"""
+Tests for the in-memory data structures behind the activity store.
+"""
+
+import time
+
+from src.models import Activity, Roster
+
+
+class TestRoster:
+    """Tests for the insertion-ordered participant roster."""
+
+    def test_preserves_insertion_order(self):
+        """Test that iteration follows the order participants were added."""
+        roster = Roster(["b@mergington.edu", "a@mergington.edu"])
+        roster.add("c@mergington.edu")
+        assert roster.to_list() == ["b@mergington.edu", "a@mergington.edu", "c@mergington.edu"]
+
+    def test_add_is_idempotent(self):
+        """Test that adding an existing participant does not duplicate them."""
+        roster = Roster(["a@mergington.edu"])
+        roster.add("a@mergington.edu")
+        assert len(roster) == 1
+
+    def test_interns_members(self):
+        """Test that equal emails share a single string object."""
+        first = "".join(["a@", "mergington.edu"])
+        second = "".join(["a@", "mergington.edu"])
+        assert Roster([first]).to_list()[0] is Roster([second]).to_list()[0]
+
+
+    def test_remove_many_returns_removed_in_order(self):
+        """Test that only members are removed, each once, keeping the rest in order."""
+        roster = Roster(["a", "b", "c", "d"])
+        assert roster.remove_many(["c", "x", "a", "c"]) == ["c", "a"]
+        assert roster.to_list() == ["b", "d"]
+        assert roster.remove_many(["d"]) == ["d"]
+        assert roster.clear() == ["b"]
+        assert len(roster) == 0
+
+    def test_remove_many_is_linear(self):
+        """Test that removing everyone costs about ten times more for ten times the roster."""
+        def best_time(size):
+            emails = [f"s{i}@mergington.edu" for i in range(size)]
+            timings = []
+            for _ in range(3):
+                roster = Roster(emails)
+                start = time.perf_counter()
+                roster.remove_many(reversed(emails))
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        # Cache effects put linear removal at 15-35 times; quadratic removal
+        # (e.g. list.remove) would be at least 100 times slower
+        assert best_time(200_000) / best_time(20_000) < 60
+
+
+class TestActivity:
+    """Tests for the slotted Activity model."""
+
+    def test_round_trips_json_shape(self):
+        """Test that to_dict returns exactly what from_dict was given."""
+        details = {
+            "description": "Learn strategies and compete in chess tournaments",
+            "schedule": "Fridays, 3:30 PM - 5:00 PM",
+            "max_participants": 12,
+            "participants": ["michael@mergington.edu", "daniel@mergington.edu"],
+        }
+        assert Activity.from_dict("Chess Club", details).to_dict() == details
+
+    def test_has_no_instance_dict(self):
+        """Test that activities do not carry a per-instance __dict__."""
+        activity = Activity("Chess Club", "", "", 12)
+        assert not hasattr(activity, "__dict__")
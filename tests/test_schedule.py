@@ -0,0 +1,103 @@
+"""
+Tests for schedule parsing and the interval index.
+"""
+
+import random
+
+import pytest
+
+from src.schedule import (
+    DAY,
+    WEEK,
+    occupancy_bitmaps,
+    parse_day,
+    parse_schedule,
+    parse_time,
+    parse_time_range,
+)
+from src.storage.intervals import IntervalIndex
+
+
+class TestParseSchedule:
+    """Tests for turning schedule strings into weekly intervals."""
+
+    def test_parses_seed_formats(self):
+        """Test the formats used by the school's catalog."""
+        assert parse_schedule("Tuesdays and Thursdays, 3:30 PM - 4:30 PM") == [
+            (1 * DAY + 930, 1 * DAY + 990),
+            (3 * DAY + 930, 3 * DAY + 990),
+        ]
+        assert parse_schedule("Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM") == [
+            (840, 900), (2 * DAY + 840, 2 * DAY + 900), (4 * DAY + 840, 4 * DAY + 900)
+        ]
+
+    def test_parses_variants(self):
+        """Test abbreviations, 24-hour times, shared AM/PM and day groups."""
+        assert parse_schedule("Mon/Wed 15:00 to 16:30") == [(900, 990), (2 * DAY + 900, 2 * DAY + 990)]
+        assert parse_schedule("Weekdays, 7:15 - 8:00 AM")[0] == (435, 480)
+        assert len(parse_schedule("Weekdays, 7:15 - 8:00 AM")) == 5
+
+    def test_splits_intervals_at_the_end_of_the_week(self):
+        """Test that a late Sunday session wraps to Monday morning."""
+        assert parse_schedule("Sundays, 11 PM - 1 AM") == [(0, 60), (WEEK - 60, WEEK)]
+
+    def test_unreadable_schedule_has_no_intervals(self):
+        """Test that free text without a time range parses to nothing."""
+        assert parse_schedule("To be announced") == []
+
+    def test_parses_query_values(self):
+        """Test the helpers used for day=, at= and between=."""
+        assert parse_day("Thursdays") == parse_day("thu") == 3
+        assert parse_time("4pm") == parse_time("16:00") == 960
+        assert parse_time_range("22:00-01:00") == (1320, 1500)
+        for bad in (lambda: parse_day("weekday"), lambda: parse_time("13pm")):
+            with pytest.raises(ValueError):
+                bad()
+
+
+class TestOccupancyBitmaps:
+    """Tests for the bitmaps used to detect schedule conflicts."""
+
+    def test_shared_bit_means_overlap(self):
+        """Test random schedules against a pairwise interval comparison."""
+        rng = random.Random(1)
+        schedules = {}
+        for key in range(60):
+            intervals = []
+            for _ in range(rng.randint(0, 3)):
+                start = rng.randrange(0, WEEK - 200, 15)
+                intervals.append((start, start + rng.randrange(15, 200, 15)))
+            schedules[key] = intervals
+        bitmaps = occupancy_bitmaps(schedules)
+
+        for a in schedules:
+            for b in schedules:
+                overlap = any(
+                    s1 < e2 and s2 < e1 for s1, e1 in schedules[a] for s2, e2 in schedules[b]
+                )
+                assert bool(bitmaps[a] & bitmaps[b]) == overlap
+
+
+class TestIntervalIndex:
+    """Tests for overlap queries."""
+
+    def test_matches_brute_force(self):
+        """Test random windows against a linear scan."""
+        rng = random.Random(0)
+        intervals = []
+        for value in range(500):
+            start = rng.randrange(WEEK - 300)
+            intervals.append((start, start + rng.randint(1, 300), value))
+        index = IntervalIndex(intervals)
+
+        for _ in range(200):
+            start = rng.randrange(WEEK)
+            end = start + rng.randint(1, 120)
+            expected = {value for s, e, value in intervals if s < end and e > start}
+            assert index.overlapping(start, end) == expected
+
+    def test_end_is_exclusive(self):
+        """Test that back-to-back intervals do not overlap."""
+        index = IntervalIndex([(0, 60, "a"), (60, 120, "b")])
+        assert index.overlapping(59, 60) == {"a"}
+        assert index.overlapping(60, 61) == {"b"}
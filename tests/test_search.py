@@ -0,0 +1,59 @@
+"""
+Tests for the inverted search index.
+"""
+
+from src.storage.search import SearchIndex, tokenize
+
+
+class TestTokenize:
+    """Tests for splitting text into search terms."""
+
+    def test_lowercases_and_folds_plurals(self):
+        """Test that case and simple plurals do not affect matching."""
+        assert tokenize("Tuesdays and Thursdays, 3:30 PM") == [
+            "tuesday", "and", "thursday", "3", "30", "pm"
+        ]
+        assert tokenize("Chess Class") == ["chess", "class"]
+
+
+class TestSearchIndex:
+    """Tests for maintaining and querying the index."""
+
+    def test_add_and_remove_update_results(self):
+        """Test that the index follows individual activity changes."""
+        index = SearchIndex()
+        index.add("Chess Club", "Strategy games", "Fridays")
+        index.add("Go Club", "Strategy games", "Mondays")
+        assert [name for name, _ in index.search("strategy")] == ["Chess Club", "Go Club"]
+
+        index.remove("Chess Club")
+        assert [name for name, _ in index.search("strategy")] == ["Go Club"]
+        assert index.search("chess") == []
+        assert len(index) == 1
+
+    def test_readding_replaces_old_terms(self):
+        """Test that re-adding an activity drops terms it no longer has."""
+        index = SearchIndex()
+        index.add("Chess Club", "Strategy games", "Fridays")
+        index.add("Chess Club", "Tournaments", "Mondays")
+        assert index.search("friday") == []
+        assert [name for name, _ in index.search("monday")] == ["Chess Club"]
+
+    def test_scores_follow_document_count(self):
+        """Test that cached single-term rankings are refreshed when the index grows."""
+        index = SearchIndex()
+        index.add("Chess Club", "Strategy games", "Fridays")
+        [(_, before)] = index.search("chess")
+        index.add("Art Club", "Painting", "Mondays")
+        [(_, after)] = index.search("chess")
+        assert after > before
+
+    def test_unknown_terms_are_not_cached(self):
+        """Test that searches for terms not in the index leave no cached results."""
+        index = SearchIndex()
+        index.add("Chess Club", "Strategy games", "Fridays")
+        for n in range(100):
+            assert index.search(f"word{n}") == []
+        assert index._ranked == {}
+        index.search("chess")
+        assert list(index._ranked) == ["chess"]
@@ -0,0 +1,501 @@
+"""
+Contract tests run against every activity store backend.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.storage import (
+    DURABILITY_MODES,
+    ActivityFullError,
+    ActivityNotFoundError,
+    AlreadySignedUpError,
+    InvalidCursorError,
+    JournaledStore,
+    MemoryStore,
+    NotSignedUpError,
+    SQLiteStore,
+    ScheduleConflictError,
+    SnapshotExpiredError,
+)
+from src.schedule import DAY, week_windows
+from src.storage.base import encode_cursor
+from src.storage.changes import ChangeLog
+
+SAMPLE_ACTIVITIES = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+    },
+    "Art Club": {
+        "description": "Explore various art mediums including painting, drawing, and sculpture",
+        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
+        "max_participants": 15,
+        "participants": ["mia@mergington.edu"]
+    },
+}
+
+
+@pytest.fixture(params=["memory", "journal", "sqlite"])
+def store(request, tmp_path):
+    """Create a store of each backend type loaded with sample data."""
+    if request.param == "memory":
+        backend = MemoryStore()
+    elif request.param == "journal":
+        backend = JournaledStore(str(tmp_path / "journal"))
+    else:
+        backend = SQLiteStore(str(tmp_path / "activities.db"))
+    backend.load(SAMPLE_ACTIVITIES)
+    yield backend
+    backend.close()
+
+
+class TestActivityStore:
+    """Behaviour every backend must share."""
+
+    def test_list_activities_round_trips_loaded_data(self, store):
+        """Test that listing returns exactly the loaded data, in order."""
+        assert store.list_activities() == SAMPLE_ACTIVITIES
+        assert list(store.list_activities()) == ["Chess Club", "Art Club"]
+
+    def test_signup_appends_participant(self, store):
+        """Test that a signup lands at the end of the roster and in the index."""
+        store.signup("Art Club", "michael@mergington.edu")
+        assert store.list_activities()["Art Club"]["participants"] == [
+            "mia@mergington.edu",
+            "michael@mergington.edu",
+        ]
+        assert store.get_student_activities("michael@mergington.edu") == [
+            "Chess Club",
+            "Art Club",
+        ]
+
+    def test_signup_errors(self, store):
+        """Test that invalid signups raise storage errors."""
+        with pytest.raises(ActivityNotFoundError):
+            store.signup("Nonexistent Club", "a@mergington.edu")
+        with pytest.raises(AlreadySignedUpError):
+            store.signup("Chess Club", "michael@mergington.edu")
+
+    def test_unregister_removes_participant(self, store):
+        """Test that unregistering removes the student from roster and index."""
+        store.unregister("Chess Club", "michael@mergington.edu")
+        assert store.list_activities()["Chess Club"]["participants"] == ["daniel@mergington.edu"]
+        assert store.get_student_activities("michael@mergington.edu") == []
+
+    def test_unregister_errors(self, store):
+        """Test that invalid unregistrations raise storage errors."""
+        with pytest.raises(ActivityNotFoundError):
+            store.unregister("Nonexistent Club", "a@mergington.edu")
+        with pytest.raises(NotSignedUpError):
+            store.unregister("Chess Club", "mia@mergington.edu")
+
+    def test_signup_detects_schedule_conflicts(self, store):
+        """Test that overlapping activities are refused unless conflicts are allowed."""
+        def activity(schedule):
+            return {"description": "", "schedule": schedule,
+                    "max_participants": 5, "participants": []}
+
+        store.load({
+            "Chess Club": activity("Fridays, 3:30 PM - 5:00 PM"),
+            "Drama Club": activity("Wednesdays and Fridays, 4:30 PM - 6:00 PM"),
+            "Art Club": activity("Fridays, 5:00 PM - 6:00 PM"),
+            "Book Club": activity("Whenever"),
+        })
+        email = "a@mergington.edu"
+        assert store.signup("Chess Club", email) == []
+        assert store.signup("Art Club", email) == []
+        assert store.signup("Book Club", email) == []
+
+        with pytest.raises(ScheduleConflictError) as error:
+            store.signup("Drama Club", email)
+        assert error.value.conflicts == ["Chess Club", "Art Club"]
+        assert store.get_student_activities(email) == ["Chess Club", "Art Club", "Book Club"]
+
+        store.unregister("Chess Club", email)
+        assert store.signup("Drama Club", email, allow_conflicts=True) == ["Art Club"]
+        assert "Drama Club" in store.get_student_activities(email)
+
+    def test_signup_many_reports_each_item(self, store):
+        """Test that a batch applies valid items and reports the rest."""
+        store.load({
+            **SAMPLE_ACTIVITIES,
+            "Tiny Club": {"description": "", "schedule": "", "max_participants": 1,
+                          "participants": []},
+        })
+        before = store.version
+        results = store.signup_many([
+            ("Chess Club", "a@mergington.edu"),
+            ("Art Club", "a@mergington.edu"),
+            ("Chess Club", "michael@mergington.edu"),
+            ("Tiny Club", "b@mergington.edu"),
+            ("Tiny Club", "c@mergington.edu"),
+            ("Robotics", "a@mergington.edu"),
+        ])
+        assert results[:2] == [[], []]
+        assert results[3] == []
+        assert [type(results[i]) for i in (2, 4, 5)] == [
+            AlreadySignedUpError, ActivityFullError, ActivityNotFoundError
+        ]
+        assert store.get_student_activities("a@mergington.edu") == ["Chess Club", "Art Club"]
+        assert store.list_activities()["Tiny Club"]["participants"] == ["b@mergington.edu"]
+
+        _, changes = store.get_changes(before)
+        assert [(c["activity"], c["email"]) for c in changes] == [
+            ("Chess Club", "a@mergington.edu"),
+            ("Art Club", "a@mergington.edu"),
+            ("Tiny Club", "b@mergington.edu"),
+        ]
+
+    def test_unregister_many_reports_each_email(self, store):
+        """Test that a batch removes listed participants and flags the rest."""
+        before = store.version
+        results = store.unregister_many(
+            "Chess Club",
+            ["daniel@mergington.edu", "mia@mergington.edu", "daniel@mergington.edu"],
+        )
+        assert results[0] is None
+        assert [type(result) for result in results[1:]] == [NotSignedUpError, NotSignedUpError]
+        assert store.list_activities()["Chess Club"]["participants"] == ["michael@mergington.edu"]
+        assert store.get_student_activities("daniel@mergington.edu") == []
+        assert len(store.get_changes(before)[1]) == 1
+        with pytest.raises(ActivityNotFoundError):
+            store.unregister_many("Robotics", [])
+
+    def test_clear_roster_reopens_activity(self, store):
+        """Test that clearing a full roster empties it and frees every seat."""
+        store.load({"Tiny Club": {"description": "", "schedule": "", "max_participants": 2,
+                                  "participants": ["a@mergington.edu", "b@mergington.edu"]}})
+        assert store.query_activities(has_openings=True)[0] == {}
+        assert store.clear_roster("Tiny Club") == ["a@mergington.edu", "b@mergington.edu"]
+        page, _ = store.query_activities(fields=["participant_count"], has_openings=True)
+        assert page == {"Tiny Club": {"participant_count": 0}}
+        assert store.get_student_activities("a@mergington.edu") == []
+        assert store.clear_roster("Tiny Club") == []
+
+    def test_unregister_many_reopens_overbooked_activity(self, store):
+        """Test that an activity loaded past capacity reopens once below it."""
+        store.load({
+            "Over Club": {"description": "", "schedule": "", "max_participants": 2,
+                          "participants": ["a@m.edu", "b@m.edu", "c@m.edu"]},
+            "Open Club": {"description": "", "schedule": "", "max_participants": 5,
+                          "participants": []},
+        })
+        store.unregister_many("Over Club", ["a@m.edu", "b@m.edu", "c@m.edu"])
+        page, _ = store.query_activities(fields=["spots_left"], has_openings=True)
+        assert page == {"Over Club": {"spots_left": 2}, "Open Club": {"spots_left": 5}}
+
+        store.signup_many([("Over Club", "d@m.edu"), ("Over Club", "e@m.edu")])
+        page, _ = store.query_activities(fields=["spots_left"], has_openings=True)
+        assert page == {"Open Club": {"spots_left": 5}}
+
+    def test_version_increases_only_on_change(self, store):
+        """Test that successful mutations bump the version and failures do not."""
+        version = store.version
+        store.signup("Art Club", "new@mergington.edu")
+        assert store.version > version
+
+        version = store.version
+        with pytest.raises(AlreadySignedUpError):
+            store.signup("Art Club", "new@mergington.edu")
+        assert store.version == version
+
+        store.unregister("Art Club", "new@mergington.edu")
+        assert store.version > version
+
+    def test_get_changes_returns_ordered_deltas(self, store):
+        """Test that changes after a version are returned in order."""
+        since = store.version
+        store.signup("Art Club", "a@mergington.edu")
+        store.unregister("Art Club", "a@mergington.edu")
+
+        version, changes = store.get_changes(since)
+        assert version == since + 2
+        assert [(c["version"], c["op"]) for c in changes] == [
+            (since + 1, "signup"),
+            (since + 2, "unregister"),
+        ]
+        assert store.get_changes(version) == (version, [])
+
+    def test_get_changes_requires_snapshot_after_load(self, store):
+        """Test that changes from before a load cannot be replayed."""
+        since = store.version
+        store.signup("Art Club", "a@mergington.edu")
+        store.load(SAMPLE_ACTIVITIES)
+        assert store.get_changes(since)[1] is None
+
+    def test_change_log_is_bounded(self, store):
+        """Test that clients behind the retained window must resync."""
+        if isinstance(store, SQLiteStore):
+            store.change_log_size = 3
+        else:
+            store.changes = ChangeLog(3)
+        since = store.version
+        for i in range(5):
+            store.signup("Art Club", f"s{i}@mergington.edu")
+        assert store.get_changes(since)[1] is None
+        assert len(store.get_changes(since + 2)[1]) == 3
+
+    def test_get_activity(self, store):
+        """Test single-activity reads, projection and missing activities."""
+        assert store.get_activity("Art Club") == SAMPLE_ACTIVITIES["Art Club"]
+        assert store.get_activity("Art Club", ["spots_left"]) == {"spots_left": 14}
+        with pytest.raises(ActivityNotFoundError):
+            store.get_activity("Nonexistent Club")
+
+    def test_empty_projection_returns_no_fields(self, store):
+        """Test that an empty field list projects every backend onto nothing."""
+        assert store.get_activity("Art Club", []) == {}
+        page, _ = store.query_activities(fields=[])
+        assert page == {"Chess Club": {}, "Art Club": {}}
+        assert store.search("chess", fields=[]) == [
+            {"name": "Chess Club", "score": store.search("chess")[0]["score"]}
+        ]
+
+    def test_get_participants_pages_roster(self, store):
+        """Test that roster pages follow signup order."""
+        store.signup("Chess Club", "third@mergington.edu")
+        page, cursor = store.get_participants("Chess Club", limit=2)
+        assert page == ["michael@mergington.edu", "daniel@mergington.edu"]
+        page, cursor = store.get_participants("Chess Club", cursor=cursor, limit=2)
+        assert page == ["third@mergington.edu"]
+        assert cursor is None
+
+    def test_query_pages_through_catalog(self, store):
+        """Test that limit and cursor split the catalog into pages."""
+        first, cursor = store.query_activities(limit=1)
+        assert list(first) == ["Chess Club"]
+        assert first["Chess Club"] == SAMPLE_ACTIVITIES["Chess Club"]
+
+        second, cursor = store.query_activities(cursor=cursor, limit=1)
+        assert list(second) == ["Art Club"]
+        assert cursor is None
+
+    def test_query_projects_and_filters(self, store):
+        """Test projection onto computed fields and the openings filter."""
+        store.load({
+            **SAMPLE_ACTIVITIES,
+            "Tiny Club": {
+                "description": "",
+                "schedule": "",
+                "max_participants": 1,
+                "participants": ["a@mergington.edu"],
+            },
+        })
+        page, _ = store.query_activities(fields=["participant_count", "spots_left"])
+        assert page["Tiny Club"] == {"participant_count": 1, "spots_left": 0}
+
+        page, _ = store.query_activities(fields=["spots_left"], has_openings=True)
+        assert list(page) == ["Chess Club", "Art Club"]
+
+        store.signup("Art Club", "b@mergington.edu")
+        store.unregister("Tiny Club", "a@mergington.edu")
+        page, _ = store.query_activities(fields=["spots_left"], has_openings=True)
+        assert page == {
+            "Chess Club": {"spots_left": 10},
+            "Art Club": {"spots_left": 13},
+            "Tiny Club": {"spots_left": 1},
+        }
+
+    def test_query_filters_by_meeting_time(self, store):
+        """Test that during= keeps activities meeting in a window, with paging and openings."""
+        store.load({
+            **SAMPLE_ACTIVITIES,
+            "Late Club": {
+                "description": "",
+                "schedule": "Fridays, 4:00 PM - 6:00 PM",
+                "max_participants": 1,
+                "participants": ["a@mergington.edu"],
+            },
+            "Unscheduled": {
+                "description": "",
+                "schedule": "To be announced",
+                "max_participants": 5,
+                "participants": [],
+            },
+        })
+        friday_4pm = week_windows([4], 16 * 60, 16 * 60 + 1)
+        page, cursor = store.query_activities(fields=["schedule"], during=friday_4pm, limit=1)
+        assert list(page) == ["Chess Club"]
+        page, cursor = store.query_activities(
+            fields=["schedule"], during=friday_4pm, cursor=cursor, limit=1
+        )
+        assert list(page) == ["Late Club"]
+        assert cursor is None
+
+        page, _ = store.query_activities(fields=["spots_left"], has_openings=True, during=friday_4pm)
+        assert list(page) == ["Chess Club"]
+
+        any_day_5pm = week_windows(range(7), 17 * 60, 17 * 60 + 1)
+        page, _ = store.query_activities(fields=["schedule"], during=any_day_5pm)
+        assert list(page) == ["Late Club"]
+
+        page, _ = store.query_activities(fields=["schedule"], during=week_windows([3]))
+        assert list(page) == ["Art Club"]
+        assert store.query_activities(during=[(0, DAY)])[0] == {}
+
+    @pytest.mark.parametrize("cursor", ["%%%", encode_cursor(-1), encode_cursor(2**63)])
+    def test_query_rejects_invalid_cursor(self, store, cursor):
+        """Test that a cursor the store did not issue is refused."""
+        with pytest.raises(InvalidCursorError):
+            store.query_activities(cursor=cursor)
+        with pytest.raises(InvalidCursorError):
+            store.get_participants("Chess Club", cursor=cursor, limit=1)
+
+    def test_search_requires_every_term(self, store):
+        """Test that results contain all query terms, in any field and letter case."""
+        assert [r["name"] for r in store.search("CHESS tournament")] == ["Chess Club"]
+        assert [r["name"] for r in store.search("thursday painting")] == ["Art Club"]
+        assert store.search("chess painting") == []
+        assert store.search("?!") == []
+
+    def test_search_ranks_name_matches_first(self, store):
+        """Test that a term in the name outranks the same term elsewhere."""
+        store.load({
+            "Strategy Games": {"description": "Chess and go", "schedule": "Mondays",
+                               "max_participants": 5, "participants": []},
+            "Chess Club": {"description": "Tournaments", "schedule": "Fridays",
+                           "max_participants": 5, "participants": []},
+        })
+        results = store.search("chess", fields=["spots_left"])
+        assert [r["name"] for r in results] == ["Chess Club", "Strategy Games"]
+        assert results[0]["score"] > results[1]["score"]
+        assert results[0]["spots_left"] == 5
+        assert len(store.search("chess", limit=1)) == 1
+
+    def test_search_index_follows_loads(self, store):
+        """Test that loading a new catalog replaces the search index."""
+        store.load({"Robotics": {"description": "Build robots", "schedule": "Tuesdays",
+                                 "max_participants": 5, "participants": []}})
+        assert store.search("chess") == []
+        assert [r["name"] for r in store.search("robot")] == ["Robotics"]
+
+    def test_export_matches_list_activities(self, store):
+        """Test that an export with no concurrent writes is the whole catalog."""
+        assert dict(store.export()) == store.list_activities()
+
+    def test_export_ignores_writes_made_while_streaming(self, store):
+        """Test that an export reflects the store as of its first activity."""
+        expected = store.list_activities()
+        export = store.export()
+        first = next(export)
+        store.signup("Art Club", "new@mergington.edu")
+        store.unregister("Art Club", "mia@mergington.edu")
+        store.unregister("Chess Club", "michael@mergington.edu")
+        assert dict([first, *export]) == expected
+
+    def test_seed_keeps_existing_data(self, store):
+        """Test that seeding a non-empty store leaves it untouched."""
+        store.signup("Art Club", "new@mergington.edu")
+        store.seed({})
+        assert "new@mergington.edu" in store.list_activities()["Art Club"]["participants"]
+
+
+class TestMemoryStore:
+    """Tests specific to the in-memory backend."""
+
+    def test_export_keeps_roster_order_of_snapshot(self):
+        """Test that a participant removed mid-export keeps their place in it."""
+        store = MemoryStore()
+        store.load({**SAMPLE_ACTIVITIES, "Drama": {
+            "description": "Plays", "schedule": "Mondays", "max_participants": 5,
+            "participants": ["a@m.edu", "b@m.edu"],
+        }})
+        export = store.export()
+        next(export)
+        store.unregister("Drama", "a@m.edu")
+        store.signup("Drama", "c@m.edu")
+        assert dict(export)["Drama"]["participants"] == ["a@m.edu", "b@m.edu"]
+
+    def test_export_outlasts_change_log(self):
+        """Test that more writes than the change log holds do not break an export."""
+        store = MemoryStore(change_log_size=10)
+        catalog = {
+            f"Club {n}": {"description": "", "schedule": "", "max_participants": 50,
+                          "participants": [f"s{i}@m.edu" for i in range(20)]}
+            for n in range(5)
+        }
+        store.load(catalog)
+        export = store.export()
+        exported = [next(export)]
+        for n in range(5):
+            store.unregister_many(f"Club {n}", [f"s{i}@m.edu" for i in range(0, 20, 2)])
+            store.signup_many([(f"Club {n}", f"new{i}@m.edu") for i in range(10)])
+        exported += export
+        assert dict(exported) == catalog
+        assert store._exports == ()
+
+    def test_export_expires_when_catalog_is_reloaded(self):
+        """Test that a reload during an export is reported rather than mixed in."""
+        store = MemoryStore()
+        store.load(SAMPLE_ACTIVITIES)
+        export = store.export()
+        next(export)
+        store.load(SAMPLE_ACTIVITIES)
+        with pytest.raises(SnapshotExpiredError):
+            next(export)
+
+
+class TestSQLiteStore:
+    """Tests specific to the SQLite backend."""
+
+    def test_writes_are_shared_between_stores(self, tmp_path):
+        """Test that two stores on one file (as in two workers) stay consistent."""
+        path = str(tmp_path / "activities.db")
+        first = SQLiteStore(path)
+        second = SQLiteStore(path)
+        first.seed(SAMPLE_ACTIVITIES)
+        second.seed(SAMPLE_ACTIVITIES)
+
+        first.signup("Art Club", "new@mergington.edu")
+        assert second.get_student_activities("new@mergington.edu") == ["Art Club"]
+        with pytest.raises(AlreadySignedUpError):
+            second.signup("Art Club", "new@mergington.edu")
+
+        first.close()
+        second.close()
+
+    def test_data_survives_reopening(self, tmp_path):
+        """Test that signups are durable across a restart."""
+        path = str(tmp_path / "activities.db")
+        store = SQLiteStore(path)
+        store.seed(SAMPLE_ACTIVITIES)
+        store.signup("Chess Club", "new@mergington.edu")
+        store.close()
+
+        reopened = SQLiteStore(path)
+        assert reopened.get_student_activities("new@mergington.edu") == ["Chess Club"]
+        assert reopened._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        reopened.close()
+
+    def test_migrates_databases_without_participant_counts(self, tmp_path):
+        """Test that files created before participant counts are upgraded."""
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE activities (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE,
+                description TEXT NOT NULL, schedule TEXT NOT NULL,
+                max_participants INTEGER NOT NULL);
+            CREATE TABLE participants (id INTEGER PRIMARY KEY, activity_id INTEGER NOT NULL,
+                email TEXT NOT NULL, UNIQUE (activity_id, email));
+            INSERT INTO activities VALUES (1, 'Chess Club', '', '', 2);
+            INSERT INTO participants VALUES (1, 1, 'a@mergington.edu');
+        """)
+        conn.close()
+
+        store = SQLiteStore(path)
+        page, _ = store.query_activities(fields=["participant_count"])
+        assert page == {"Chess Club": {"participant_count": 1}}
+        assert [r["name"] for r in store.search("chess")] == ["Chess Club"]
+        assert store.query_activities(during=[(0, 7 * DAY)])[0] == {}
+        store.close()
+
+    @pytest.mark.parametrize("durability, level", list(zip(DURABILITY_MODES, [2, 1, 0])))
+    def test_durability_sets_synchronous_pragma(self, tmp_path, durability, level):
+        """Test that each durability mode maps to a SQLite synchronous level."""
+        store = SQLiteStore(str(tmp_path / "activities.db"), durability)
+        assert store._connection().execute("PRAGMA synchronous").fetchone()[0] == level
+        store.close()